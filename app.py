@@ -1,30 +1,34 @@
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import inch
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-from reportlab.lib.units import cm
-import io
-
-from io import BytesIO
-from reportlab.lib import colors
-from reportlab.lib.colors import Color
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import pagesizes
-
-from reportlab.pdfbase.pdfmetrics import stringWidth
+import time
+
+# Dicatat sebelum import berat supaya ikut terukur
+rerun_mulai = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-from datetime import datetime, date, timedelta
-import matplotlib.pyplot as plt
-import streamlit as st
+import numpy as np
+from datetime import date, timedelta
+import threading
 import uuid
+from concurrent.futures import Future
 
+import psycopg2
 from PIL import Image
-from reportlab.platypus import Image as RLImage
-from reportlab.pdfgen import canvas
+
+# Logika inti ada di package homestay (tanpa Streamlit); file ini
+# hanya UI + cache per proses/sesi di sekitarnya.
+from homestay import availability, pricing, render, repository
+from homestay.availability import bulan_berikutnya
+from homestay.formatting import DATE_COLUMNS, MONEY_COLUMNS
+from homestay.pricing import harga_rata_malam
+from homestay.render import RENDER_MAX_WORKERS, finish_report
+from homestay.report_cache import (
+    data_fingerprint,
+    report_cache_get,
+    report_cache_info,
+    report_cache_put,
+)
+from homestay.repository import BookingConflict, jendela_mulai, ringkasan_kpi
+from homestay.status import get_status
 
 bulan_indonesia = {
     1: "JANUARI",
@@ -41,54 +45,37 @@ bulan_indonesia = {
     12: "DESEMBER"
 }
 
-pdfmetrics.registerFont(
-    TTFont('Playfair-Bold', 'assets/pairflay/PlayfairDisplay-Bold.ttf')
-)
-
-pdfmetrics.registerFont(
-    TTFont('Poppins-Regular', 'assets/poppins/Poppins-Regular.ttf')
-)
-
-pdfmetrics.registerFont(
-    TTFont('Poppins-Light', 'assets/poppins/Poppins-Light.ttf')
-)
-
-def add_lunas_watermark(canvas, doc):
-    canvas.saveState()
-    
-    canvas.setFont("Helvetica-Bold", 80)
-    
-    # warna hijau transparan
-    canvas.setFillColor(Color(0, 0.5, 0, alpha=0.15))
-    
-    canvas.translate(300, 400)
-    canvas.rotate(45)
-    
-    canvas.drawCentredString(0, 0, "LUNAS")
-    
-    canvas.restoreState()
-
-def add_watermark(canvas, doc):
-    canvas.saveState()
-
-    # Transparansi sangat tipis
-    canvas.setFillAlpha(0.015)
-
-    # Abu-abu sangat soft
-    canvas.setFillColor(colors.HexColor("#BDBDBD"))
-
-    # Font lebih ringan & sedikit lebih kecil
-    canvas.setFont("Helvetica-Bold", 55)
-
-    width, height = doc.pagesize
-    canvas.translate(width / 2, height / 2)
-    canvas.rotate(45)
-
-    canvas.drawCentredString(0, 0, "HOMESTAY ALVIRA")
-
-    canvas.restoreState()
+# ============================
+# STARTUP
+# ============================
 
-logo = Image.open("assets/logo.png")
+# Batas waktu (detik): run pertama setelah proses start & rerun biasa.
+# Lebih dari ini muncul peringatan di panel "Waktu Muat".
+BUDGET_COLD_START = 5.0
+BUDGET_RERUN = 0.8
+
+@st.cache_resource
+def startup_info():
+    """Statistik waktu muat per proses; cold_start diisi di akhir run pertama."""
+    return {
+        "mulai": rerun_mulai,
+        "cold_start": None,
+        "reruns": 0,
+        "rerun_total": 0.0,
+        "rerun_max": 0.0,
+        "lock": threading.Lock(),
+    }
+
+startup_info()
+
+@st.cache_resource
+def load_logo():
+    """Logo header, di-decode sekali per proses."""
+    logo = Image.open("assets/logo.png")
+    logo.load()
+    return logo
+
+logo = load_logo()
 
 col1, col2 = st.columns([0.8, 6], gap="small")
 
@@ -124,918 +111,415 @@ st.title("")
 # DATABASE
 # ============================
 
-import psycopg2
-import streamlit as st
+@st.cache_resource
+def get_pool():
+    """1 pool per proses, dipakai bersama semua sesi Streamlit."""
+    return repository.create_pool(st.secrets["DATABASE_URL"])
 
-conn = psycopg2.connect(
-    st.secrets["DATABASE_URL"],
-    sslmode="require"
-)
-    
-cursor = conn.cursor()
-    
-# Create tables
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS bookings (
-    id SERIAL PRIMARY KEY,
-    nama TEXT,
-    hp TEXT,
-    kamar TEXT,
-    checkin DATE,
-    checkout DATE,
-    harga INTEGER,
-    total INTEGER,
-    dp INTEGER DEFAULT 0,
-    sisa INTEGER DEFAULT 0,
-    status TEXT
-);
-""")
-conn.commit()
-st.success("Tabel 'bookings' berhasil dibuat atau sudah ada!")
-        
-        # Jika ada query lain di baris 214 atau sekitarnya, tambahkan di sini
-        # Misalnya, jika ini INSERT atau SELECT, ganti dengan kode Anda
-        # Contoh INSERT ke tabel bookings:
-        # cursor.execute("""
-        #     INSERT INTO bookings (nama, hp, kamar, checkin, checkout, harga, total, dp, sisa, status)
-        #     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
-        # """, ("Nama Contoh", "08123456789", "Room 1", "2023-01-01", "2023-01-02", 100000, 100000, 50000, 50000, "Confirmed"))
-        # conn.commit()
-        # st.write("Data berhasil dimasukkan!")
-        
-        # Contoh SELECT:
-        # cursor.execute("SELECT * FROM rooms;")
-        # results = cursor.fetchall()
-        # st.write(results)
+def db_conn():
+    """Pinjam 1 koneksi dari pool untuk 1 unit kerja (lihat repository.connection)."""
+    return repository.connection(get_pool())
 
-        
-    # ============================
-    # CREATE TABLE ROOMS
-    # ============================
-cursor.execute("""
-    CREATE TABLE IF NOT EXISTS rooms (
-        id SERIAL PRIMARY KEY,
-        nama_kamar TEXT UNIQUE,
-        harga INTEGER,
-        aktif INTEGER DEFAULT 1
-    );
-    """)
-
-conn.commit()
-st.success("Database ready ✅")
-
-    # ============================
-    # FUNCTIONS
-    # ============================
-        
-    # Fungsi ini bisa dipanggil di luar blok database, tapi jika menggunakan cursor, pastikan di dalam try
-    # (Untuk sekarang, functions didefinisikan di sini; panggil di tempat lain jika perlu)
-        
-    # Catatan: harga_kamar tidak didefinisikan di sini; pastikan didefinisikan di tempat lain atau tambahkan
-    
+def pool_metrics():
+    return repository.pool_metrics(get_pool())
 
 # ============================
-# FUNCTIONS
+# MIGRASI SCHEMA
 # ============================
 
-from datetime import timedelta
+@st.cache_resource
+def run_migrations():
+    """
+    Jalan sekali per proses (st.cache_resource), jadi rerun biasa tidak
+    mengirim DDL sama sekali. Return daftar versi yang baru diterapkan.
+    """
+    with db_conn() as conn:
+        return repository.apply_migrations(conn)
+
+# Migrasi gagal (mis. data lama bentrok) → tampilkan pesannya & berhenti.
+# Gagal tidak di-cache, jadi rerun berikutnya mencoba lagi.
+try:
+    run_migrations()
+except psycopg2.Error as e:
+    st.error(f"Migrasi database gagal: {e.pgerror or e}")
+    if getattr(e, "diag", None) is not None and e.diag.message_hint:
+        st.info(e.diag.message_hint)
+    st.stop()
 
-def hitung_total_kamar(kamar, checkin, checkout):
-    # Asumsikan harga_kamar didefinisikan di tempat lain, misalnya:
-    # harga_kamar = {"Room1": {"weekday": 100000, "weekend": 150000}, ...}
-    # Jika tidak, tambahkan atau pass
-    total = 0
-    current = checkin
-    
-    while current < checkout:
-        weekday_number = current.weekday()  # 0=Senin, 6=Minggu
-        
-        if weekday_number <= 3:  # Senin-Kamis
-            harga = harga_kamar[kamar]["weekday"]
-        else:  # Jumat-Minggu
-            harga = harga_kamar[kamar]["weekend"]
-        
-        total += harga
-        current += timedelta(days=1)
-    
-    return total
+# ============================
+# UPDATE STATUS OTOMATIS (SET-BASED)
+# ============================
 
-def get_status(checkin, checkout, sisa):
-    today = date.today()
+@st.cache_data(show_spinner=False)
+def refresh_status(today):
+    """
+    Sinkronkan kolom status dengan tanggal hari ini dalam 1 statement.
 
-    # 1️⃣ PRIORITAS UTAMA → Kalau sudah lewat tanggal
-    if today > checkout:
-        return "Selesai"
+    Di-cache per tanggal, jadi hanya jalan sekali per pergantian hari
+    (atau setelah cache di-clear). Return jumlah baris yang berubah.
+    """
+    with db_conn() as conn:
+        return repository.refresh_status(conn, today)
 
-    # 2️⃣ Kalau hari ini checkout
-    if today == checkout:
-        return "Check-out"
+@st.cache_data(show_spinner=False)
+def prune_log_hapus(today):
+    """Pangkas bookings_deleted sekali per hari per proses."""
+    with db_conn() as conn:
+        return repository.prune_bookings_deleted(conn)
 
-    # 3️⃣ Kalau sedang menginap
-    if checkin <= today < checkout:
-        return "Check-in"
+def find_conflicts(kamar_list, checkin, checkout, booking_id=None):
+    with db_conn() as conn:
+        return repository.find_conflicts(conn, kamar_list, checkin, checkout, booking_id)
 
-    # 4️⃣ Kalau belum masuk tanggal
-    if today < checkin:
-        if sisa <= 0:
-            return "Lunas"
-        return "Booked"
+def is_double_booking(kamar, checkin, checkout, booking_id=None):
+    return bool(find_conflicts([kamar], checkin, checkout, booking_id))
 
-    return "Booked"
+# ============================
+# SIMPAN BOOKING (ATOMIK)
+# ============================
 
-def is_double_booking(kamar, checkin, checkout, booking_id=None):
+def simpan_booking(nama, hp, kamar_list, checkin, checkout, dp):
+    """
+    Simpan booking multi-kamar (lihat repository.simpan_booking).
 
-    query = """
-        SELECT 1
-        FROM bookings
-        WHERE kamar = %s
-        AND (%s IS NULL OR id != %s)
-        AND (
-            checkin::date < %s::date
-            AND checkout::date > %s::date
-        )
-        LIMIT 1
+    Return group_id, atau raise BookingConflict berisi kamar yang bentrok.
     """
+    # Kalender diambil sebelum meminjam koneksi: kalau cache-nya dingin,
+    # membangunnya butuh koneksi kedua dari pool yang sama
+    kal = price_calendar()
 
-    cursor.execute(
-        query,
-        (
-            kamar,
-            booking_id, booking_id,
-            checkout, checkin
+    with db_conn() as conn:
+        group_id, ids = repository.simpan_booking(
+            conn, kal, nama, hp, kamar_list, checkin, checkout, dp
         )
-    )
 
-    result = cursor.fetchone()
-
-    return result is not None
+    invalidate_bookings(ids)
+    return group_id
 
 # ============================
 # LOAD DATA FUNCTION
 # ============================
 
-@st.cache_data(ttl=60)
-def load_data():
-    query = "SELECT * FROM bookings ORDER BY checkin ASC LIMIT 200"
-    df = pd.read_sql_query(query, conn)
-    return df
+# Jumlah baris per halaman tabel utama
+HALAMAN_UKURAN = 50
 
-def load_data():
-    try:
-        query = """
-        SELECT 
-            id,
-            nama,
-            hp,
-            kamar,
-            checkin,
-            checkout,
-            harga,
-            total,
-            dp,
-            sisa,
-            status,
-            group_id
-        FROM bookings
-        """
-        df = pd.read_sql_query(query, conn)
-        return df
+@st.cache_resource(max_entries=1)
+def booking_snapshot(mulai):
+    """
+    Snapshot booking di jendela operasional (checkin >= mulai) per proses,
+    dipakai bersama semua sesi. Ganti bulan → snapshot baru.
+    """
+    return repository.new_snapshot(mulai)
 
-    except Exception as e:
-        st.error(f"Database error: {e}")
-        return pd.DataFrame()
+def _sync_snapshot(snap):
+    with db_conn() as conn:
+        repository.sync_snapshot(conn, snap)
 
-# ============================
-# EXPORT FUNCTIONS
-# ============================
+def invalidate_bookings(ids):
+    """Tandai booking yang baru ditulis supaya sync berikutnya mengambil ulang."""
+    snap = booking_snapshot(jendela_mulai())
 
-def generate_excel(df):
-    output = BytesIO()
+    with snap["lock"]:
+        snap["dirty"].update(int(i) for i in ids)
 
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df_excel = df.copy()
+    load_kpi.clear()
+    data_grafik.clear()
+    load_rekap_bulan.clear()
 
-        # Format rupiah
-        def rupiah(x):
-            try:
-                return f"Rp {int(x):,}".replace(",", ".")
-            except:
-                return x
+def reset_snapshot():
+    """Buang seluruh snapshot (misalnya setelah reset database)."""
+    repository.clear_snapshot(booking_snapshot(jendela_mulai()))
 
-        for col in ["harga", "total", "dp", "sisa"]:
-            if col in df_excel.columns:
-                df_excel[col] = df_excel[col].apply(rupiah)
+    load_kpi.clear()
+    data_grafik.clear()
+    load_rekap_bulan.clear()
+    load_tahun_booking.clear()
 
-        df_excel.to_excel(writer, index=False, sheet_name='Laporan Booking')
+def load_data():
+    """
+    Data booking di jendela operasional tanpa membaca ulang seluruh tabel.
 
-        workbook = writer.book
-        worksheet = writer.sheets['Laporan Booking']
+    Load penuh hanya sekali per proses (per jendela); setelah itu cuma
+    baris yang berubah (updated_at), dihapus (bookings_deleted) atau
+    ditandai dirty yang diambil dari database.
+    """
+    snap = booking_snapshot(jendela_mulai())
 
-        # Format warna status
-        format_booked = workbook.add_format({'bg_color': '#FFF3B0'})
-        format_checkin = workbook.add_format({'bg_color': '#B6F2B6'})
-        format_checkout = workbook.add_format({'bg_color': '#A0E7FF'})
-        format_selesai = workbook.add_format({'bg_color': '#D3D3D3'})
-        format_lunas = workbook.add_format({'bg_color': '#C8F7C5'})
+    try:
+        with snap["lock"]:
+            _sync_snapshot(snap)
+            return snap["df"].reset_index(drop=True)
 
-        status_col = df_excel.columns.get_loc("status")
+    except Exception as e:
+        st.error(f"Database error: {e}")
+        return pd.DataFrame()
 
-        for row_num, value in enumerate(df_excel["status"], start=1):
-            if value == "Booked":
-                worksheet.write(row_num, status_col, value, format_booked)
-            elif value == "Check-in":
-                worksheet.write(row_num, status_col, value, format_checkin)
-            elif value == "Check-out":
-                worksheet.write(row_num, status_col, value, format_checkout)
-            elif value == "Selesai":
-                worksheet.write(row_num, status_col, value, format_selesai)
-            elif value == "Lunas":
-                worksheet.write(row_num, status_col, value, format_lunas)
+# ============================
+# OKUPANSI KAMAR (BITMAP)
+# ============================
 
-    return output.getvalue()
+def kamar_kosong(kamar_list, checkin, checkout):
+    """
+    Kamar dari kamar_list yang kosong semua malam [checkin, checkout).
 
-def generate_pdf(df):
+    Dijawab dari bitmap snapshot (sudah di-sync load_data di rerun ini);
+    rentang di luar bitmap dicek ke database. Simpan booking tetap
+    dijaga constraint bookings_kamar_no_overlap.
+    """
+    snap = booking_snapshot(jendela_mulai())
 
-    buffer = BytesIO()   # ← WAJIB ADA
-    
-    doc = SimpleDocTemplate(buffer, pagesize=pagesizes.A4)
-    elements = []
+    with snap["lock"]:
+        if snap["okupansi"] is not None:
+            kosong = availability.kamar_kosong(snap["okupansi"], kamar_list, checkin, checkout)
 
-    styles = getSampleStyleSheet()
+            if kosong is not None:
+                return kosong
 
-    # ======================
-    # HEADER PREMIUM
-    # ======================
-    
-    logo = RLImage("assets/logo.png", width=1.3*inch, height=1.3*inch)
-    
-    title_style = ParagraphStyle(
-        "TitleStyle",
-        parent=styles["Normal"],
-        fontName="Playfair-Bold",
-        fontSize=20,
-        leading=24,
-        textColor=colors.HexColor("#1B5E20"),
-        alignment=1,
-        spaceAfter=5
-    )
-    
-    subtitle_style = ParagraphStyle(
-        "SubtitleStyle",
-        parent=styles["Normal"],
-        fontSize=12,
-        leading=16,
-        textColor=colors.black,
-        alignment=1,
-        spaceAfter=6
-    )
-    
-    info_style = ParagraphStyle(
-        "InfoStyle",
-        parent=styles["Normal"],
-        fontName="Poppins-Regular",
-        fontSize=8,
-        leading=10,
-        textColor=colors.grey,
-        alignment=1,
-        spaceAfter=3
-    )
-     
-    header_text = [
-        Paragraph("<b>HOMESTAY ALVIRA SIDOARJO</b>", title_style),
-        Spacer(1, 2),  # 🔥 tambahan jarak manual
-        Paragraph("<b>LAPORAN BOOKING</b>", subtitle_style),
-        Spacer(1, 4),  # 🔥 tambahan jarak manual
-        Paragraph("Jl. Raya Lingkar Barat Gading Fajar 2 Blok C5 No 28 Kota Sidoarjo - Jawa Timur", info_style),
-        Paragraph("Telp: 081231646523 (Bu Yanie) | Website: www.alvirahomestay.com", info_style),
-    ]
+    bentrok = set(find_conflicts(kamar_list, checkin, checkout))
+    return [k for k in kamar_list if k not in bentrok]
 
-    header_table = Table(
-        [[logo, header_text]],
-        colWidths=[3*cm, 12*cm]
-    )
-    
-    header_table.setStyle(TableStyle([
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-    
-        # Logo kolom 0
-        ("LEFTPADDING", (0,0), (0,0), 0),
-    
-        # Text kolom 1 → geser ke kanan
-        ("LEFTPADDING", (1,0), (1,0), 20),
-    
-        ("RIGHTPADDING", (0,0), (-1,-1), 6),
-        ("TOPPADDING", (0,0), (-1,-1), 6),
-        ("BOTTOMPADDING", (0,0), (-1,-1), 6),
-    ]))
-    
-    elements.append(header_table)
-    elements.append(Spacer(1, 6))
-    
-    gold_line = Table([[""]], colWidths=[17*cm])
-    gold_line.setStyle(TableStyle([
-        ('LINEBELOW', (0,0), (-1,-1), 1, colors.HexColor("#C6A700"))
-    ]))
-    
-    elements.append(gold_line)
-    elements.append(Spacer(1, 15))
-
-    def rupiah(x):
-        try:
-            return f"Rp {int(x):,}".replace(",", ".")
-        except:
-            return x
-
-    df_pdf = df.copy()
+def cari_ketersediaan(kamar, checkin, checkout, booking_id=None, jumlah=3):
+    """
+    Ketersediaan 1 kamar + saran (lihat availability.cari_ketersediaan).
 
-    # 🔥 WAJIB: convert datetime dulu
-    df_pdf["checkin"] = pd.to_datetime(df_pdf["checkin"], errors="coerce")
-    df_pdf["checkout"] = pd.to_datetime(df_pdf["checkout"], errors="coerce")
+    Di luar rentang bitmap hanya dicek ke database, tanpa saran.
+    """
+    kal = price_calendar()
+    tarif = dict(zip(kal["kamar"], kal["tarif_weekday"]))
+    snap = booking_snapshot(jendela_mulai())
+
+    with snap["lock"]:
+        if snap["okupansi"] is not None:
+            hasil = availability.cari_ketersediaan(
+                snap["okupansi"], tarif, kamar, checkin, checkout, booking_id, jumlah
+            )
 
-    # Urutkan berdasarkan checkin
-    df_pdf = df_pdf.sort_values("checkin")
-
-    # Buat kolom bulan SEBELUM format string
-    df_pdf["bulan"] = df_pdf["checkin"].dt.to_period("M")
-
-    # Loop per bulan
-    for periode, group in df_pdf.groupby("bulan"):
-
-        nama_bulan = periode.strftime("%B %Y").upper()
-        elements.append(Paragraph(f"📅 {nama_bulan}", styles["Heading2"]))
-        elements.append(Spacer(1, 10))
-
-        # Reset nomor urut khusus bulan ini
-        group = group.sort_values("checkin").reset_index(drop=True)
-        group.index = group.index + 1
-        group.index.name = "No"
-        group = group.reset_index()
-
-        # Format tanggal ke string SETELAH grouping
-        group["checkin"] = group["checkin"].dt.strftime("%d-%m-%Y")
-        group["checkout"] = group["checkout"].dt.strftime("%d-%m-%Y")
-
-        # Format rupiah
-        for col in ["harga", "total", "dp", "sisa"]:
-            if col in group.columns:
-                group[col] = group[col].apply(rupiah)
-
-        # Hapus kolom bulan
-        group_export = group.drop(columns=["bulan"])
-
-        data = [group_export.columns.tolist()] + group_export.values.tolist()
-
-        table = Table(data, repeatRows=1)
-
-        style = [
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#1E8449")),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor("#C8A951")),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ]
-
-        # Warna status
-        if "status" in group_export.columns:
-            status_index = group_export.columns.get_loc("status")
-
-            for i, status in enumerate(group_export["status"], start=1):
-                if status == "Booked":
-                    style.append(('BACKGROUND', (status_index, i), (status_index, i), colors.HexColor("#FFF3B0")))
-                elif status == "Check-in":
-                    style.append(('BACKGROUND', (status_index, i), (status_index, i), colors.HexColor("#B6F2B6")))
-                elif status == "Check-out":
-                    style.append(('BACKGROUND', (status_index, i), (status_index, i), colors.HexColor("#A0E7FF")))
-                elif status == "Selesai":
-                    style.append(('BACKGROUND', (status_index, i), (status_index, i), colors.HexColor("#D3D3D3")))
-                elif status == "Lunas":
-                    style.append(('BACKGROUND', (status_index, i), (status_index, i), colors.HexColor("#C8F7C5")))
-
-        table.setStyle(style)
-
-        elements.append(table)
-        elements.append(Spacer(1, 20))
-
-        disclaimer_style = ParagraphStyle(
-            'Disclaimer',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.HexColor("#C0392B")
-        )
-        
-        elements.append(Spacer(1, 15))
-        elements.append(Paragraph(
-            "*harga dapat berubah sewaktu-waktu",
-            disclaimer_style
-        ))
+            if hasil is not None:
+                return hasil
 
-    doc.build(elements, onFirstPage=add_watermark, onLaterPages=add_watermark)
+    return {
+        "tersedia": not is_double_booking(kamar, checkin, checkout, booking_id),
+        "kamar_lain": [],
+        "tanggal_lain": [],
+    }
 
-    pdf = buffer.getvalue()
-    buffer.close()
-    return pdf
+def okupansi_bulan(kamar_list, bulan):
+    snap = booking_snapshot(jendela_mulai())
 
-def generate_invoice(bookings):
+    with snap["lock"]:
+        return availability.okupansi_bulan(snap["okupansi"], kamar_list, bulan)
 
-    if not bookings:
-        return None
+# ============================
+# QUERY BOOKING (FILTER DI SQL)
+# ============================
 
-    first = bookings[0]
+def query_bookings(mulai=None, sampai=None, status=None, after=None, limit=None):
+    with db_conn() as conn:
+        return repository.query_bookings(conn, mulai, sampai, status, after, limit)
 
-    invoice_number = first.get("group_id", first["id"])
-    nama = first["nama"]
-    hp = first["hp"]
+@st.cache_data(ttl=300, show_spinner=False)
+def load_bulan_arsip(sebelum):
+    """Daftar bulan (tanggal 1) yang punya booking sebelum jendela operasional."""
+    with db_conn() as conn:
+        return repository.bulan_arsip(conn, sebelum)
 
-    grand_total = sum(b["total"] for b in bookings)
-    grand_dp = sum(b["dp"] for b in bookings)
-    grand_sisa = grand_total - grand_dp
+def query_open_groups():
+    with db_conn() as conn:
+        return repository.query_open_groups(conn)
 
-    buffer = BytesIO()
+def query_groups(group_ids):
+    with db_conn() as conn:
+        return repository.query_groups(conn, group_ids)
 
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=pagesizes.A4,
-        rightMargin=30,
-        leftMargin=40,
-        topMargin=40,
-        bottomMargin=40
-    )
+# ============================
+# KPI (AGREGASI DI SQL)
+# ============================
 
-    elements = []
-    styles = getSampleStyleSheet()
+@st.cache_data(ttl=60, show_spinner=False)
+def load_kpi(dari, sampai):
+    with db_conn() as conn:
+        return repository.load_kpi(conn, dari, sampai)
 
-    # =========================
-    # FORMAT RUPIAH
-    # =========================
-    def rupiah(x):
-        return f"Rp {int(x):,}".replace(",", ".")
+@st.cache_data(ttl=60, show_spinner=False)
+def data_grafik(dari, sampai):
+    """
+    Data semua grafik dashboard dari load_kpi, dihitung sekali per data.
 
-    # =========================
-    # HEADER
-    # =========================
-    logo = RLImage("assets/logo.png", width=1.1*inch, height=1.1*inch)
-
-    title_style = ParagraphStyle(
-        "BrandTitle",
-        parent=styles["Heading1"],
-        fontSize=16,
-        textColor=colors.HexColor("#1B5E20"),
-        spaceAfter=4
-    )
+    Grafik digambar Streamlit di browser (vector), jadi server tidak
+    membuat/menyimpan figure apa pun per rerun.
+    """
+    kpi = load_kpi(dari, sampai)
+    per_bulan = kpi.groupby("bulan")[["pendapatan", "dp", "sisa"]].sum()
+    per_bulan.index = pd.to_datetime(per_bulan.index)
+
+    per_kamar = kpi.groupby("kamar")[["pendapatan", "malam_terjual", "malam_tersedia"]].sum()
+
+    return {
+        "per_kamar": per_kamar[["pendapatan"]].rename(columns={"pendapatan": "Pendapatan"}),
+        "per_bulan": per_bulan[["pendapatan"]].rename(columns={"pendapatan": "Pendapatan"}),
+        "okupansi": pd.DataFrame({
+            "Okupansi (%)": (
+                100 * per_kamar["malam_terjual"] / per_kamar["malam_tersedia"].where(per_kamar["malam_tersedia"] > 0)
+            ).fillna(0).round(1)
+        }),
+        "dp_sisa": per_bulan[["dp", "sisa"]].rename(columns={"dp": "DP", "sisa": "Sisa"}),
+    }
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_rekap_bulan(dari):
+    with db_conn() as conn:
+        return repository.rekap_bulan(conn, dari)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_tahun_booking():
+    with db_conn() as conn:
+        return repository.tahun_booking(conn)
 
-    info_style = ParagraphStyle(
-        "InfoStyle",
-        parent=styles["Normal"],
-        fontSize=8,
-        textColor=colors.grey,
-        leading=10
-    )
+# ============================
+# FORMAT RUPIAH & STATUS
+# ============================
 
-    header_left = [
-        Paragraph("<b>HOMESTAY ALVIRA SIDOARJO</b>", title_style),
-        Paragraph("Jl. Raya Lingkar Barat Gading Fajar 2 Blok C5 No 28", info_style),
-        Paragraph("Sidoarjo - Jawa Timur", info_style),
-        Paragraph("Telp: 081231646523", info_style),
-    ]
+# Label status berwarna untuk st.dataframe (warna sama dengan STATUS_COLORS)
+STATUS_BADGE = {
+    "Booked": "🟡 Booked",
+    "Check-in": "🟢 Check-in",
+    "Check-out": "🔵 Check-out",
+    "Selesai": "⚪ Selesai",
+    "Lunas": "✅ Lunas",
+}
 
-    group_id = selected_data.get("group_id")
-    
-    header_right = [
-        Paragraph("<b>INVOICE</b>", styles["Title"]),
-        Spacer(1, 6),
-        Paragraph(f"Invoice #: INV-{datetime.now().year}-{invoice_number}", styles["Normal"]),
-        Paragraph(f"Date: {datetime.now().strftime('%d %b %Y')}", styles["Normal"]),
-    ]
+def tabel_booking(df):
+    """
+    Siapkan booking untuk st.dataframe tanpa Styler.
 
-    header_table = Table(
-        [[logo, header_left, header_right]],
-        colWidths=[1.3*inch, 3.2*inch, 2.3*inch]
-    )
+    Uang & tanggal tetap angka/tanggal asli (diformat oleh column_config),
+    status diganti label berwarna lewat 1 kali Series.map.
+    """
+    df = df.copy()
 
-    header_table.setStyle(TableStyle([
-        ("VALIGN", (0,0), (-1,-1), "TOP"),
-        ("LEFTPADDING", (1,0), (1,0), 0),
-        ("LEFTPADDING", (2,0), (2,0), 30),
-        ("RIGHTPADDING", (0,0), (-1,-1), 0),
-    ]))
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
 
-    elements.append(header_table)
-    elements.append(Spacer(1, 25))
+    if "status" in df.columns:
+        df["status"] = df["status"].map(STATUS_BADGE).fillna(df["status"])
 
-    # =========================
-    # BILL TO
-    # =========================
-    bill_to = Table([
-        ["Bill To"],
-        [nama],
-        [hp],
-    ], colWidths=[3*inch])
+    return df
 
-    bill_to.setStyle(TableStyle([
-        ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
-        ('FONTSIZE', (0,0), (-1,-1), 10),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-    ]))
+def booking_column_config():
+    config = {
+        col: st.column_config.NumberColumn(f"{col} (Rp)", format="localized")
+        for col in MONEY_COLUMNS
+    }
 
-    bill_to.hAlign = 'LEFT'
+    for col in DATE_COLUMNS:
+        config[col] = st.column_config.DateColumn(col, format="DD-MM-YYYY")
 
-    elements.append(bill_to)
-    elements.append(Spacer(1, 20))
+    return config
 
-    # =========================
-    # ITEM TABLE
-    # =========================
-        
-    item_data = [["Kamar", "Check-in", "Check-out", "Nights", "Amount"]]
+# ============================
+# LAPORAN ON-DEMAND (RENDER EXECUTOR)
+# ============================
 
-    grand_total = 0
-    grand_dp = 0
-    
-    for b in bookings:
-    
-        checkin = b["checkin"]
-        checkout = b["checkout"]
-    
-        if hasattr(checkin, "date"):
-            checkin = checkin.date()
-        if hasattr(checkout, "date"):
-            checkout = checkout.date()
-    
-        nights = (checkout - checkin).days
-        harga = b["harga"]
-    
-        subtotal = nights * harga
-    
-        grand_total += subtotal
-        grand_dp += b.get("dp", 0)
-    
-        item_data.append([
-            f"Kamar {b['kamar']}",
-            str(checkin),
-            str(checkout),
-            str(nights),
-            rupiah(subtotal)
-        ])
-    
-    grand_sisa = grand_total - grand_dp
+# Orkestrasi & cache disk ada di homestay.render / homestay.report_cache;
+# di sini hanya executor per server & progres di UI.
 
-    item_table = Table(item_data, colWidths=[1.2*inch, 1.2*inch, 1.2*inch, 0.8*inch, 1.2*inch])
+@st.cache_resource
+def render_executor():
+    """1 process pool per server, dipakai bersama semua sesi (lihat render.create_executor)."""
+    return render.create_executor()
 
-    item_table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#F2F3F4")),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.HexColor("#D5D8DC")),
-        ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
-        ('FONTSIZE', (0,0), (-1,-1), 9),
-        ('ALIGN', (1,1), (-1,-1), 'CENTER'),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-    ]))
+def submit_render(key, fn, *args):
+    return render.submit_render(render_executor(), key, fn, *args)
 
-    elements.append(item_table)
-    elements.append(Spacer(1, 30))
+def render_info():
+    return render.render_info(render_executor())
 
-    # =========================
-    # TOTAL SECTION
-    # =========================
-    total_table = Table([
-        ["TOTAL", rupiah(grand_total)],
-        ["DP", rupiah(grand_dp)],
-        ["SISA", rupiah(grand_sisa)],
-    ], colWidths=[4.6*inch, 1.2*inch])
-
-    total_table.setStyle(TableStyle([
-        # garis atas
-        ('LINEABOVE', (0,0), (-1,-1), 1.5, colors.black),
-    
-        # font
-        ('FONTNAME', (0,0), (-1,-1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0,0), (-1,-1), 11),
-    
-        # 🔥 ALIGN KANAN SEMUA HARGA (kolom ke-1 index 1)
-        ('ALIGN', (1,0), (1,-1), 'RIGHT'),
-    
-        # padding biar rata kanan sempurna
-        ('RIGHTPADDING', (1,0), (1,-1), 0),
-        ('LEFTPADDING', (1,0), (1,-1), 0),
-    
-        # spacing atas bawah
-        ('TOPPADDING', (0,0), (-1,-1), 8),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 8),
-    ]))
+@st.fragment(run_every=1)
+def pantau_render(jobs, mulai, teks="Menyiapkan laporan"):
+    """
+    Progres job render (list Future), di-refresh tiap detik tanpa rerun
+    seluruh halaman. Begitu semua selesai, halaman di-rerun sekali untuk
+    mengambil hasilnya.
+    """
+    selesai = sum(f.done() for f in jobs)
 
-    elements.append(total_table)
-    elements.append(Spacer(1, 60))
+    if selesai == len(jobs):
+        st.rerun()
 
-    # =========================
-    # WATERMARK LUNAS PREMIUM (ENHANCED VERSION WITH PREMIUM DESIGN - FIXED POLYGON AND STROKE ISSUES)
-    # =========================
-    from math import cos, sin, radians
-    
-    def draw_bottom_text(canvas, text, center_x, center_y, radius):
-        angle_step = 10  # Diubah ke 10 derajat untuk jarak antar huruf yang lebih dekat
-        angle = -50  # Diubah ke -75 untuk geser ke kanan menyamping agar tidak bertabrakan dengan "ALVIRA HOMESTAY"
-        
-        for char in text:
-            canvas.saveState()
-            canvas.translate(center_x, center_y)
-            canvas.rotate(angle)
-            canvas.drawCentredString(0, -radius, char)
-            canvas.restoreState()
-            angle += angle_step
-    
-    def draw_top_text(canvas, text, center_x, center_y, radius):
-        angle_step = 180 / len(text)
-        angle = 90
-        
-        for char in text:
-            canvas.saveState()
-            canvas.translate(center_x, center_y)
-            canvas.rotate(angle)
-            canvas.drawCentredString(0, radius, char)
-            canvas.restoreState()
-            angle -= angle_step
-    
-    def add_lunas_watermark(canvas, doc):
-        canvas.saveState()
-        
-        width, height = doc.pagesize
-        x = width / 2
-        y = height / 2 - 100  # Posisi diturunkan agar tidak mengganggu tabel
-        
-        # Warna merah transparan yang lebih halus
-        red_transparent = Color(0.9, 0.1, 0.1, alpha=0.25)
-        light_red = Color(1, 0.5, 0.5, alpha=0.15)
-        
-        # Lingkaran luar dengan gradien simulasi (lapisan)
-        canvas.setStrokeColor(red_transparent)
-        canvas.setFillColor(red_transparent)
-        canvas.setLineWidth(6)
-        canvas.circle(x, y, 130)
-        
-        canvas.setStrokeColor(light_red)
-        canvas.setFillColor(light_red)
-        canvas.setLineWidth(4)
-        canvas.circle(x, y, 125)
-        
-        # Lingkaran dalam
-        canvas.setStrokeColor(red_transparent)
-        canvas.setFillColor(red_transparent)
-        canvas.setLineWidth(3)
-        canvas.circle(x, y, 95)
-        
-        # Garis putus-putus tengah yang lebih halus
-        canvas.setLineWidth(1)
-        canvas.setDash(3, 3)
-        canvas.setStrokeColor(Color(0.8, 0.2, 0.2, alpha=0.4))
-        canvas.circle(x, y, 108)
-        canvas.setDash()
-        
-        # Elemen dekoratif: bintang kecil di sekitar - DIHAPUS sesuai permintaan
-        
-        # Tulisan melengkung atas: ALVIRA HOMESTAY
-        canvas.setFont("Helvetica-Bold", 9)
-        canvas.setFillColor(Color(0.6, 0, 0, alpha=0.7))
-        draw_top_text(canvas, "ALVIRA HOMESTAY", x, y, 115)
-        
-        # Tulisan tengah LUNAS dengan font yang lebih elegan dan efek
-        canvas.setFont("Times-Bold", 60)
-        canvas.translate(x, y)
-        canvas.rotate(15)  # Rotasi lebih kecil untuk kesan lebih stabil
-        canvas.setFillColor(Color(0.7, 0, 0, alpha=0.8))  # Warna lebih gelap untuk kontras
-        canvas.drawCentredString(0, -20, "LUNAS")
-        canvas.rotate(-15)
-        canvas.translate(-x, -y)
-        
-        # Tanggal pelunasan kecil di tengah bawah dengan posisi yang lebih baik
-        tanggal_lunas = datetime.now().strftime("%d %b %Y")
-        canvas.setFont("Helvetica", 12)
-        canvas.setFillColor(Color(0.5, 0, 0, alpha=0.6))
-        canvas.drawCentredString(x, y - 60, f"Paid on {tanggal_lunas}")
-        
-        # Kalimat terima kasih melengkung di bawah, agak turun (radius 110), jarak huruf dekat (10 derajat), geser ke kanan (angle -75)
-        canvas.setFont("Helvetica-Bold", 8)
-        canvas.setFillColor(Color(0.6, 0, 0, alpha=0.7))
-        draw_bottom_text(canvas, "Terima Kasih", x, y, 110)
-        
-        canvas.restoreState()
-    
-    # Kondisi pembangunan dokumen tetap sama
-    # 🔥 PENTING: build di luar function
-    if grand_sisa <= 0:
-        doc.build(elements, onFirstPage=add_lunas_watermark)
+    if len(jobs) > 1:
+        st.progress(selesai / len(jobs), text=f"{teks}: {selesai}/{len(jobs)}")
     else:
-        doc.build(elements)
-        
-    buffer.seek(0)
-    pdf = buffer.getvalue()
-    buffer.close()
-        
-    if not pdf:
-        return None
-        
-    return pdf
-
-def generate_pdf_public(df):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=pagesizes.A4)
-    elements = []
-
-    styles = getSampleStyleSheet()
-
-    # ======================
-    # HEADER PREMIUM
-    # ======================
-    
-    logo = RLImage("assets/logo.png", width=1.3*inch, height=1.3*inch)
-    
-    title_style = ParagraphStyle(
-        "TitleStyle",
-        parent=styles["Normal"],
-        fontName="Playfair-Bold",
-        fontSize=20,
-        leading=24,
-        textColor=colors.HexColor("#1B5E20"),
-        alignment=1,
-        spaceAfter=5
-    )
-    
-    subtitle_style = ParagraphStyle(
-        "SubtitleStyle",
-        parent=styles["Normal"],
-        fontSize=12,
-        leading=16,
-        textColor=colors.black,
-        alignment=1,
-        spaceAfter=6
-    )
-    
-    info_style = ParagraphStyle(
-        "InfoStyle",
-        parent=styles["Normal"],
-        fontName="Poppins-Regular",
-        fontSize=8,
-        leading=10,
-        textColor=colors.grey,
-        alignment=1,
-        spaceAfter=3
-    )
-     
-    header_text = [
-        Paragraph("<b>HOMESTAY ALVIRA SIDOARJO</b>", title_style),
-        Spacer(1, 2),  # 🔥 tambahan jarak manual
-        Paragraph("<b>LAPORAN BOOKING</b>", subtitle_style),
-        Spacer(1, 4),  # 🔥 tambahan jarak manual
-        Paragraph("Jl. Raya Lingkar Barat Gading Fajar 2 Blok C5 No 28 Sidoarjo Kota - Jawa Timur", info_style),
-        Paragraph("Telp: 081231646523 (Bu Yanie) | Website: www.alvirahomestay.com", info_style),
-    ]
+        tahap = "sedang dirender" if jobs[0].running() else "menunggu worker"
+        st.caption(f"⏳ {teks}: {tahap} ({time.perf_counter() - mulai:.0f} dtk)")
 
-    header_table = Table(
-        [[logo, header_text]],
-        colWidths=[3*cm, 12*cm]
+def build_report(jenis, fingerprint, df):
+    return render.build_report(
+        render_executor(), jenis, fingerprint, df,
+        load_rekap=lambda: load_rekap_bulan(jendela_mulai())
     )
-    
-    header_table.setStyle(TableStyle([
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-    
-        # Logo kolom 0
-        ("LEFTPADDING", (0,0), (0,0), 0),
-    
-        # Text kolom 1 → geser ke kanan
-        ("LEFTPADDING", (1,0), (1,0), 20),
-    
-        ("RIGHTPADDING", (0,0), (-1,-1), 6),
-        ("TOPPADDING", (0,0), (-1,-1), 6),
-        ("BOTTOMPADDING", (0,0), (-1,-1), 6),
-    ]))
-    
-    elements.append(header_table)
-    elements.append(Spacer(1, 6))
-    
-    gold_line = Table([[""]], colWidths=[17*cm])
-    gold_line.setStyle(TableStyle([
-        ('LINEBELOW', (0,0), (-1,-1), 1, colors.HexColor("#C6A700"))
-    ]))
-    
-    elements.append(gold_line)
-    elements.append(Spacer(1, 15))
-
-    df_pdf = df.copy()
 
-    # Convert ke datetime dulu
-    df_pdf["checkin"] = pd.to_datetime(df_pdf["checkin"], errors="coerce")
-    df_pdf["checkout"] = pd.to_datetime(df_pdf["checkout"], errors="coerce")
-
-    # Urutkan berdasarkan checkin
-    df_pdf = df_pdf.sort_values("checkin")
-
-    # Buat kolom bulan
-    df_pdf["bulan"] = df_pdf["checkin"].dt.to_period("M")
-
-    # Loop per bulan
-    for periode, group in df_pdf.groupby("bulan"):
-
-        nama_bulan = periode.strftime("%B %Y").upper()
-        elements.append(Paragraph(f"📅 {nama_bulan}", styles["Heading2"]))
-        elements.append(Spacer(1, 10))
-
-        group = group.sort_values("checkin").reset_index(drop=True)
-
-        # Nomor urut per bulan
-        group.index = group.index + 1
-        group.index.name = "No"
-        group = group.reset_index()
-
-        # Format tanggal
-        group["checkin"] = group["checkin"].dt.strftime("%d-%m-%Y")
-        group["checkout"] = group["checkout"].dt.strftime("%d-%m-%Y")
-
-        # ❌ HIDE KOLOM HARGA UNTUK PUBLIC
-        for col in ["harga", "total", "dp", "sisa", "id","hp"]:
-            if col in group.columns:
-                group = group.drop(columns=[col])
-
-        group_export = group.drop(columns=["bulan"])
+# ============================
+# KALENDER HARGA
+# ============================
 
-        data = [group_export.columns.tolist()] + group_export.values.tolist()
+@st.cache_data(ttl=60, show_spinner=False)
+def load_tarif_versi():
+    with db_conn() as conn:
+        return repository.tarif_versi(conn)
 
-        table = Table(data, repeatRows=1)
+@st.cache_resource(max_entries=2, show_spinner=False)
+def build_price_calendar(versi, tahun):
+    """
+    Kalender harga (lihat pricing.build_price_calendar) untuk 1 versi tarif.
 
-        style = [
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#1E8449")),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor("#C8A951")),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ]
+    Di-cache per (versi, tahun), jadi hanya dibangun ulang kalau tarif
+    di database berubah (atau ganti tahun).
+    """
+    with db_conn() as conn:
+        rooms, musiman, libur = repository.load_tarif(conn)
 
-        # 🎨 Warna Status
-        if "status" in group_export.columns:
-            status_index = group_export.columns.get_loc("status")
+    return pricing.build_price_calendar(rooms, musiman, libur, versi, tahun)
 
-            for i, status in enumerate(group_export["status"], start=1):
-                if status == "Booked":
-                    style.append(('BACKGROUND', (status_index, i), (status_index, i), colors.HexColor("#FFF3B0")))
-                elif status == "Check-in":
-                    style.append(('BACKGROUND', (status_index, i), (status_index, i), colors.HexColor("#B6F2B6")))
-                elif status == "Check-out":
-                    style.append(('BACKGROUND', (status_index, i), (status_index, i), colors.HexColor("#A0E7FF")))
-                elif status == "Selesai":
-                    style.append(('BACKGROUND', (status_index, i), (status_index, i), colors.HexColor("#D3D3D3")))
-                elif status == "Lunas":
-                    style.append(('BACKGROUND', (status_index, i), (status_index, i), colors.HexColor("#C8F7C5")))
+def price_calendar():
+    return build_price_calendar(load_tarif_versi(), date.today().year)
 
-        table.setStyle(style)
+# ============================
+# HITUNG HARGA (VECTORIZED)
+# ============================
 
-        elements.append(table)
-        elements.append(Spacer(1, 20))
+def hitung_harga(kamar, checkin, checkout):
+    return pricing.hitung_harga(price_calendar(), kamar, checkin, checkout)
 
-    doc.build(elements, onFirstPage=add_watermark, onLaterPages=add_watermark)
+def hitung_total_kamar(kamar, checkin, checkout):
+    return pricing.hitung_total_kamar(price_calendar(), kamar, checkin, checkout)
 
-    pdf = buffer.getvalue()
-    buffer.close()
-    return pdf
+def rincian_harga(kamar, checkin, checkout):
+    return pricing.rincian_harga(price_calendar(), kamar, checkin, checkout)
 
 # ============================
-# MASTER HARGA KAMAR
+# TAMBAH BOOKING (UPGRADE)
 # ============================
-harga_kamar = {
-    "Alvira 1": {
-        "weekday": 350000,
-        "weekend": 400000
-    },
-    "Alvira 2": {
-        "weekday": 300000,
-        "weekend": 350000
-    },
-    "Alvira 3": {
-        "weekday": 190000,
-        "weekend": 225000
-    },
-    "Alvira 4": {
-        "weekday": 300000,
-        "weekend": 350000
-    },
-    "Alvira 5": {
-        "weekday": 450000,
-        "weekend": 500000
-    },
-}
 
-def hitung_total_kamar(kamar, checkin, checkout):
-    total = 0
-    current_date = checkin
+def tampil_saran(area, kamar, checkin, checkout, booking_id=None):
+    """Pesan bentrok + saran kamar lain / tanggal terdekat di area (st / st.sidebar)."""
+    hasil = cari_ketersediaan(kamar, checkin, checkout, booking_id)
 
-    while current_date < checkout:
-        # Weekend = Jumat (4), Sabtu (5), Minggu (6)
-        if current_date.weekday() >= 4:
-            total += harga_kamar[kamar]["weekend"]
-        else:
-            total += harga_kamar[kamar]["weekday"]
+    if hasil["tersedia"]:
+        return True
 
-        current_date += timedelta(days=1)
+    area.warning(f"⚠️ {kamar} sudah terisi di tanggal tersebut")
 
-    return total
+    if hasil["kamar_lain"]:
+        area.caption("Kamar lain yang kosong: " + ", ".join(hasil["kamar_lain"]))
 
-# ============================
-# TAMBAH BOOKING (UPGRADE)
-# ============================
+    if hasil["tanggal_lain"]:
+        area.caption(
+            f"Tanggal terdekat untuk {kamar}: "
+            + "; ".join(f"{ci:%d-%m-%Y} s/d {co:%d-%m-%Y}" for ci, co in hasil["tanggal_lain"])
+        )
+
+    return False
 
 st.sidebar.header("➕ Tambah Booking")
 
@@ -1044,7 +528,7 @@ with st.sidebar.form("form_tambah_booking"):
     nama = st.text_input("Nama Tamu")
     hp = st.text_input("No HP")
 
-    kamar_list = ["Alvira 1", "Alvira 2", "Alvira 3", "Alvira 4", "Alvira 5"]
+    kamar_list = price_calendar()["kamar"]
     kamar = st.multiselect("Pilih Kamar", kamar_list)
 
     checkin = st.date_input("Check-in")
@@ -1065,38 +549,29 @@ st.sidebar.markdown(f"🛏 Jumlah Kamar: **{jumlah_kamar}**")
 
 if kamar and checkout > checkin:
 
+    for k in kamar:
+        tampil_saran(st.sidebar, k, checkin, checkout)
+
     st.sidebar.markdown("### 💰 Rincian Harga")
 
-    total_semua = 0
-    
-    for k in kamar:
+    subtotal_kamar = hitung_harga(kamar, checkin, checkout)
+
+    for k, total_kamar in zip(kamar, subtotal_kamar):
         st.sidebar.markdown(f"#### 🛏 {k}")
-        
-        current_date = checkin
-        total_kamar = 0
-    
-        while current_date < checkout:
-            if current_date.weekday() >= 5:
-                harga = harga_kamar[k]["weekend"]
-                tipe = "Weekend"
-            else:
-                harga = harga_kamar[k]["weekday"]
-                tipe = "Weekday"
-    
-            st.sidebar.write(
-                f"{current_date} ({tipe}) : Rp {harga:,.0f}".replace(",", ".")
-            )
-    
-            total_kamar += harga
-            current_date += timedelta(days=1)
-    
+
+        for harga, malam in rincian_harga(k, checkin, checkout):
+            if malam:
+                st.sidebar.write(
+                    f"{malam} malam × Rp {harga:,.0f}".replace(",", ".")
+                )
+
         st.sidebar.markdown(
             f"**Subtotal {k}: Rp {total_kamar:,.0f}**".replace(",", ".")
         )
         st.sidebar.markdown("---")
-    
-        total_semua += total_kamar
-    
+
+    total_semua = int(subtotal_kamar.sum())
+
     st.sidebar.markdown(
         f"### 💵 Total Booking: Rp {total_semua:,.0f}".replace(",", ".")
     )
@@ -1115,62 +590,227 @@ if st.sidebar.button("Simpan Booking"):
 
     else:
         try:
-            # 🔥 Buat 1 GROUP ID untuk semua kamar
-            group_id = str(uuid.uuid4())[:8]
-
-            total_semua = 0
-
-            # Cek double booking dulu
-            for k in kamar:
-                if is_double_booking(k, checkin, checkout):
-                    st.sidebar.error(f"❌ {k} sudah dibooking di tanggal tersebut!")
-                    st.stop()
-
-                total_kamar = hitung_total_kamar(k, checkin, checkout)
-                total_semua += total_kamar
-
-            # 💎 Split DP rata per kamar
-            dp_per_kamar = dp / len(kamar)
-            sisa_group = total_semua - dp
-            status_group = get_status(checkin, checkout, sisa_group)
-
-            # 🔥 Insert per kamar tapi group_id sama
-            for k in kamar:
-                total_kamar = hitung_total_kamar(k, checkin, checkout)
-                sisa_kamar = total_kamar - dp_per_kamar
-
-                cursor.execute("""
-                    INSERT INTO bookings
-                    (nama, hp, kamar, checkin, checkout, harga,
-                     total, dp, sisa, status, group_id)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    nama,
-                    hp,
-                    k,
-                    str(checkin),
-                    str(checkout),
-                    0,
-                    total_kamar,
-                    dp_per_kamar,
-                    sisa_kamar,
-                    status_group,
-                    group_id
-                ))
-
-            conn.commit()
+            group_id = simpan_booking(nama, hp, kamar, checkin, checkout, dp)
+
             st.sidebar.success(f"✅ Booking berhasil! Invoice Group: {group_id}")
-            st.cache_data.clear()
             st.rerun()
 
+        except BookingConflict as e:
+            st.sidebar.error(f"❌ {', '.join(e.kamar)} sudah dibooking di tanggal tersebut!")
+
+            for k in e.kamar:
+                tampil_saran(st.sidebar, k, checkin, checkout)
+
         except Exception as e:
             st.sidebar.error(f"Terjadi error: {e}")
         
+# ============================
+# TARIF KAMAR
+# ============================
+
+def simpan_tarif(fn, *args):
+    """Jalankan 1 fungsi tulis tarif dari repository, mis. repository.hapus_hari_libur."""
+    with db_conn() as conn:
+        fn(conn, *args)
+
+    # Versi tarif naik lewat trigger; ambil versi baru di rerun berikutnya
+    load_tarif_versi.clear()
+
+with st.sidebar.expander("🏷️ Tarif Kamar"):
+
+    kal = price_calendar()
+
+    st.dataframe(
+        pd.DataFrame({
+            "Kamar": kal["kamar"],
+            "Weekday": kal["tarif_weekday"],
+            "Weekend": kal["tarif_weekend"],
+        }),
+        hide_index=True
+    )
+
+    with st.form("form_tarif_dasar"):
+        st.markdown("**Tarif Dasar**")
+        tarif_kamar = st.selectbox("Kamar", kal["kamar"], key="tarif_kamar")
+        tarif_weekday = st.number_input("Weekday", min_value=0, step=25000, format="%d", key="tarif_weekday")
+        tarif_weekend = st.number_input("Weekend", min_value=0, step=25000, format="%d", key="tarif_weekend")
+
+        if st.form_submit_button("💾 Simpan Tarif Dasar"):
+            simpan_tarif(
+                repository.simpan_tarif_dasar,
+                tarif_kamar, tarif_weekday, tarif_weekend
+            )
+            st.rerun()
+
+    with st.form("form_tarif_musiman"):
+        st.markdown("**Tarif Musiman**")
+        musim_kamar = st.selectbox("Kamar", ["Semua Kamar"] + kal["kamar"], key="musim_kamar")
+        musim_mulai = st.date_input("Mulai")
+        musim_selesai = st.date_input("Selesai")
+        musim_weekday = st.number_input("Weekday", min_value=0, step=25000, format="%d", key="musim_weekday")
+        musim_weekend = st.number_input("Weekend", min_value=0, step=25000, format="%d", key="musim_weekend")
+        musim_ket = st.text_input("Keterangan")
+
+        if st.form_submit_button("💾 Simpan Tarif Musiman"):
+            if musim_selesai < musim_mulai:
+                st.error("Tanggal selesai harus setelah tanggal mulai")
+            else:
+                simpan_tarif(
+                    repository.tambah_tarif_musiman,
+                    None if musim_kamar == "Semua Kamar" else musim_kamar,
+                    musim_mulai, musim_selesai,
+                    musim_weekday, musim_weekend,
+                    musim_ket
+                )
+                st.rerun()
+
+    if not kal["musiman"].empty:
+        st.dataframe(kal["musiman"], hide_index=True)
+
+        hapus_musim = st.selectbox("Hapus tarif musiman (ID)", kal["musiman"]["id"].tolist())
+        if st.button("🗑️ Hapus Tarif Musiman"):
+            simpan_tarif(repository.hapus_tarif_musiman, hapus_musim)
+            st.rerun()
+
+    with st.form("form_hari_libur"):
+        st.markdown("**Hari Libur Nasional**")
+        libur_tanggal = st.date_input("Tanggal")
+        libur_nama = st.text_input("Nama Hari Libur")
+        libur_tambahan = st.number_input("Tambahan per Malam", min_value=0, step=25000, format="%d")
+
+        if st.form_submit_button("💾 Simpan Hari Libur"):
+            simpan_tarif(
+                repository.simpan_hari_libur,
+                libur_tanggal, libur_nama, libur_tambahan
+            )
+            st.rerun()
+
+    if not kal["libur"].empty:
+        st.dataframe(kal["libur"], hide_index=True)
+
+        hapus_libur = st.selectbox("Hapus hari libur", kal["libur"]["tanggal"].tolist())
+        if st.button("🗑️ Hapus Hari Libur"):
+            simpan_tarif(repository.hapus_hari_libur, hapus_libur)
+            st.rerun()
+
 # ============================
 # LOAD DATA
 # ============================
+status_changed = refresh_status(date.today())
+prune_log_hapus(date.today())
+
+if status_changed:
+    st.sidebar.caption(f"🔄 Status otomatis: {status_changed} booking diperbarui hari ini")
+
+jendela = jendela_mulai()
 df = load_data()
 
+with st.sidebar.expander("🔌 Koneksi Database"):
+    pm = pool_metrics()
+    st.write(f"Dipakai: {pm['in_use']} / {pm['max_conn']}")
+    st.write(f"Checkout: {pm['checkouts']} (antre {pm['waits']}x)")
+    st.write(
+        f"Latensi checkout: rata-rata {pm['checkout_ms_avg']:.1f} ms, "
+        f"maks {pm['checkout_ms_max']:.1f} ms"
+    )
+    st.write(f"Reconnect: {pm['reconnects']}")
+
+def tampil_arsip():
+    """Bulan sebelum jendela operasional, dimuat hanya kalau dipilih."""
+    bulan_arsip = load_bulan_arsip(jendela)
+
+    if not bulan_arsip:
+        return
+
+    with st.expander(f"🗄️ Arsip (sebelum {bulan_indonesia[jendela.month]} {jendela.year})"):
+        pilih_bulan = st.selectbox(
+            "Pilih bulan",
+            [None] + bulan_arsip,
+            format_func=lambda d: "— pilih bulan —" if d is None
+            else f"{bulan_indonesia[d.month]} {d.year}",
+            key="arsip_bulan"
+        )
+
+        if pilih_bulan is not None:
+            arsip = tabel_booking(query_bookings(pilih_bulan, bulan_berikutnya(pilih_bulan)))
+            arsip.insert(0, "No", range(1, len(arsip) + 1))
+            st.dataframe(
+                arsip,
+                column_config=booking_column_config(),
+                use_container_width=True,
+                hide_index=True
+            )
+
+def tampil_ketersediaan():
+    """Kamar kosong untuk rentang tanggal + peta okupansi per bulan."""
+    st.subheader("🗓️ Ketersediaan Kamar")
+
+    kamar_semua = price_calendar()["kamar"]
+
+    c1, c2 = st.columns(2)
+    cek_masuk = c1.date_input("Dari", date.today(), key="cek_masuk")
+    cek_keluar = c2.date_input("Sampai", date.today() + timedelta(days=1), key="cek_keluar")
+
+    if cek_keluar <= cek_masuk:
+        st.warning("Tanggal 'Sampai' harus setelah 'Dari'.")
+    else:
+        kosong = kamar_kosong(kamar_semua, cek_masuk, cek_keluar)
+
+        if kosong:
+            st.success("Kosong: " + ", ".join(kosong))
+        else:
+            st.error("Semua kamar terisi di rentang ini.")
+
+    # Bulan ini + 5 bulan ke depan
+    pilihan_bulan = [date.today().replace(day=1)]
+    for _ in range(5):
+        pilihan_bulan.append(bulan_berikutnya(pilihan_bulan[-1]))
+
+    bulan_peta = st.selectbox(
+        "Peta okupansi",
+        pilihan_bulan,
+        format_func=lambda d: f"{bulan_indonesia[d.month]} {d.year}",
+        key="peta_bulan"
+    )
+
+    # 🟥 terisi, 🟩 kosong; kolom = tanggal
+    peta = okupansi_bulan(kamar_semua, bulan_peta)
+    st.dataframe(
+        pd.DataFrame(np.where(peta, "🟥", "🟩"), index=peta.index, columns=peta.columns),
+        use_container_width=True
+    )
+
+def tampil_bulan(periode, group, rekap_bulan, judul=True):
+    """Judul + rekap (dari monthly_summary) + tabel booking 1 bulan."""
+    if judul:
+        st.markdown(f"## 📅 {periode.strftime('%B %Y').upper()}")
+
+    bulan = periode.start_time.date()
+    if bulan in rekap_bulan.index:
+        r = rekap_bulan.loc[bulan]
+        st.caption(
+            f"{int(r['booking'])} booking · {int(r['malam'])} malam · "
+            f"Pendapatan Rp {r['pendapatan']:,.0f} · DP Rp {r['dp']:,.0f} · "
+            f"Sisa Rp {r['sisa']:,.0f}".replace(",", ".")
+        )
+
+    if judul:
+        st.markdown("---")
+
+    group = tabel_booking(group.sort_values("checkin").reset_index(drop=True))
+
+    # Nomor urut mulai 1
+    group.insert(0, "No", range(1, len(group) + 1))
+
+    st.dataframe(
+        group,
+        column_config=booking_column_config(),
+        use_container_width=True,
+        hide_index=True
+    )
+
+tampil_ketersediaan()
+
 if not df.empty:
 
     # Pastikan datetime
@@ -1185,97 +825,92 @@ if not df.empty:
     # ============================
     st.subheader("📋 Data Booking (Tabel Utama)")
 
-    df_display = df.copy()
+    col_f1, col_f2 = st.columns(2)
+    filter_mulai = col_f1.date_input("Check-in sejak", jendela, key="filter_mulai")
+    filter_status = col_f2.multiselect(
+        "Status",
+        ["Booked", "Lunas", "Check-in", "Check-out", "Selesai"],
+        key="filter_status"
+    )
 
-    # Format tanggal tanpa jam
-    df_display["checkin"] = df_display["checkin"].dt.strftime("%d-%m-%Y")
-    df_display["checkout"] = df_display["checkout"].dt.strftime("%d-%m-%Y")
+    # Keyset pagination: simpan (checkin, id) baris terakhir tiap halaman.
+    # Filter berubah → mulai lagi dari halaman pertama.
+    filter_key = (filter_mulai, tuple(filter_status))
+    if st.session_state.get("halaman_filter") != filter_key:
+        st.session_state.halaman_filter = filter_key
+        st.session_state.halaman_cursor = [None]
 
-    # Tambahkan nomor urut mulai dari 1
-    df_display.insert(0, "No", range(1, len(df_display) + 1))
+    cursor_stack = st.session_state.halaman_cursor
 
-    # Format rupiah
-    def format_rupiah(x):
-        try:
-            return f"Rp {int(x):,}".replace(",", ".")
-        except:
-            return x
-
-    for col in ["harga", "total", "dp", "sisa"]:
-        if col in df_display.columns:
-            df_display[col] = df_display[col].apply(format_rupiah)
-
-    # Styling status
-    def highlight_status(val):
-        if val == "Check-in":
-            return "background-color: #b6f2b6; font-weight: bold;"
-        elif val == "Booked":
-            return "background-color: #fff3b0; font-weight: bold;"
-        elif val == "Check-out":
-            return "background-color: #a0e7ff; font-weight: bold;"
-        elif val == "Selesai":
-            return "background-color: #d3d3d3; font-weight: bold;"
-        elif val == "Lunas":
-            return "background-color: #c8f7c5; font-weight: bold;"
-        return ""
-
-    styled_df = df_display.style.applymap(highlight_status, subset=["status"])
-
-    st.dataframe(styled_df, use_container_width=True, hide_index=True)
+    halaman = query_bookings(
+        filter_mulai,
+        status=filter_status,
+        after=cursor_stack[-1],
+        limit=HALAMAN_UKURAN + 1
+    )
 
-    st.markdown("---")
+    ada_berikutnya = len(halaman) > HALAMAN_UKURAN
+    halaman = halaman.head(HALAMAN_UKURAN)
 
-    # ============================
-    # TAMPIL PER BULAN
-    # ============================
+    df_display = tabel_booking(halaman)
 
-    df["bulan"] = df["checkin"].dt.to_period("M")
+    # Nomor urut lanjut antar halaman
+    offset = (len(cursor_stack) - 1) * HALAMAN_UKURAN
+    df_display.insert(0, "No", range(offset + 1, offset + len(df_display) + 1))
 
-    for periode, group in df.groupby("bulan"):
-
-        nama_bulan = periode.strftime("%B %Y").upper()
-        st.markdown(f"## 📅 {nama_bulan}")
-        st.markdown("---")
+    st.dataframe(
+        df_display,
+        column_config=booking_column_config(),
+        use_container_width=True,
+        hide_index=True
+    )
 
-        group = group.sort_values("checkin").reset_index(drop=True)
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
 
-        # Nomor urut mulai 1
-        group.insert(0, "No", range(1, len(group) + 1))
+    if col_prev.button("⬅️ Sebelumnya", disabled=len(cursor_stack) == 1):
+        cursor_stack.pop()
+        st.rerun()
 
-        # Format tanggal
-        group["checkin"] = group["checkin"].dt.strftime("%d-%m-%Y")
-        group["checkout"] = group["checkout"].dt.strftime("%d-%m-%Y")
+    col_info.caption(f"Halaman {len(cursor_stack)}")
 
-        group_display = group.drop(columns=["bulan"])
+    if col_next.button("Berikutnya ➡️", disabled=not ada_berikutnya):
+        last = halaman.iloc[-1]
+        cursor_stack.append((last["checkin"], int(last["id"])))
+        st.rerun()
 
-        st.dataframe(group_display, use_container_width=True, hide_index=True)
+    st.markdown("---")
 
     # ============================
-    # UPDATE STATUS OTOMATIS
+    # TAMPIL PER BULAN
     # ============================
 
-    for index, row in df.iterrows():
-        checkin_date = pd.to_datetime(row["checkin"]).date()
-        checkout_date = pd.to_datetime(row["checkout"]).date()
-        sisa_value = row["sisa"] if row["sisa"] is not None else 0
+    # Hanya bulan yang dipilih yang dirender langsung; bulan lain di
+    # expander dan baru dibuat tabelnya kalau toggle-nya dinyalakan.
+    rekap_bulan = load_rekap_bulan(jendela)
+    periode_bulan = df["checkin"].dt.to_period("M")
+    daftar_bulan = sorted(periode_bulan.dropna().unique())
+
+    sekarang = pd.Period(date.today(), "M")
+    pilih_bulan = st.selectbox(
+        "📅 Bulan",
+        daftar_bulan,
+        index=daftar_bulan.index(sekarang) if sekarang in daftar_bulan else len(daftar_bulan) - 1,
+        format_func=lambda p: p.strftime("%B %Y").upper(),
+        key="nav_bulan"
+    )
 
-        new_status = get_status(checkin_date, checkout_date, sisa_value)
+    tampil_bulan(pilih_bulan, df[periode_bulan == pilih_bulan], rekap_bulan)
 
-        cursor.execute(
-            "UPDATE bookings SET status=%s WHERE id=%s",
-            (new_status, row["id"])
-        )
+    for periode in daftar_bulan:
+        if periode == pilih_bulan:
+            continue
 
-    conn.commit()
+        with st.expander(f"📅 {periode.strftime('%B %Y').upper()}"):
+            if st.toggle("Tampilkan data", key=f"buka_{periode}"):
+                tampil_bulan(periode, df[periode_bulan == periode], rekap_bulan, judul=False)
 
-    df = load_data()
+    tampil_arsip()
 
-    def format_rupiah(x):
-        try:
-            return f"Rp {int(x):,}".replace(",", ".")
-        except:
-            return x
-    
     # ============================
     # DOWNLOAD LAPORAN
     # ============================
@@ -1298,35 +933,76 @@ if not df.empty:
     df_export.index += 1
     df_export.index.name = "No"
     
-    # Generate file
-    excel_file = generate_excel(df_export)
-    pdf_file = generate_pdf(df_export)
-    public_pdf = generate_pdf_public(df_export)
-    
-    with col_dl1:
-        st.download_button(
-            label="⬇️ Download Excel",
-            data=excel_file,
-            file_name="laporan_booking.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-    
-    with col_dl2:
-        st.download_button(
-            label="⬇️ Download PDF",
-            data=pdf_file,
-            file_name="laporan_booking.pdf",
-            mime="application/pdf"
-        )
-    
-    with col_dl3:
-        st.download_button(
-            label="📅 Download Jadwal (Tanpa Harga)",
-            data=public_pdf,
-            file_name="jadwal_booking_public.pdf",
-            mime="application/pdf"
-        )
-        
+    # File baru dibuat kalau diminta (tombol "Siapkan"), lalu di-cache
+    # berdasarkan isi data. Rerun biasa tidak menyentuh ReportLab/xlsxwriter.
+    fp_export = data_fingerprint(df_export)
+
+    daftar_laporan = [
+        (col_dl1, "excel", "⚙️ Siapkan Excel", "⬇️ Download Excel",
+         "laporan_booking.xlsx",
+         "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+        (col_dl2, "pdf", "⚙️ Siapkan PDF", "⬇️ Download PDF",
+         "laporan_booking.pdf", "application/pdf"),
+        (col_dl3, "public", "⚙️ Siapkan Jadwal", "📅 Download Jadwal (Tanpa Harga)",
+         "jadwal_booking_public.pdf", "application/pdf"),
+    ]
+
+    for col_dl, jenis, label_siapkan, label_download, file_name, mime in daftar_laporan:
+        with col_dl:
+            siap = st.session_state.get(f"laporan_{jenis}")
+
+            # File lama tidak dipakai lagi kalau datanya sudah berubah
+            if siap is not None and siap[0] != fp_export:
+                siap = None
+
+            # Masih ada job di worker: tampilkan progres; kalau semua
+            # sudah selesai, gabungkan & simpan ke cache
+            if siap is not None and isinstance(siap[1], list):
+                jobs = [part for _, part in siap[1] if isinstance(part, Future)]
+
+                if all(job.done() for job in jobs):
+                    try:
+                        siap = (fp_export, finish_report(jenis, fp_export, siap[1]))
+                    except Exception as e:
+                        st.error(f"Gagal membuat laporan: {e}")
+                        siap = None
+
+                    st.session_state[f"laporan_{jenis}"] = siap
+
+                else:
+                    pantau_render(jobs, siap[2])
+                    continue
+
+            if siap is not None:
+                st.download_button(
+                    label=label_download,
+                    data=siap[1],
+                    file_name=file_name,
+                    mime=mime
+                )
+
+            elif st.button(label_siapkan, key=f"siapkan_{jenis}"):
+                hasil = build_report(jenis, fp_export, df_export)
+
+                if hasil is None:
+                    st.warning("Antrean laporan sedang penuh, coba lagi sebentar.")
+                else:
+                    st.session_state[f"laporan_{jenis}"] = (
+                        fp_export, hasil, time.perf_counter()
+                    )
+                    st.rerun()
+
+    cache_info = report_cache_info()
+    st.caption(
+        f"Cache laporan: {cache_info['hits']} hit, {cache_info['misses']} miss, "
+        f"{cache_info['evictions']} dibuang, {cache_info['bytes'] / 1024 / 1024:.1f} MB"
+    )
+
+    info_render = render_info()
+    st.caption(
+        f"Render worker: {info_render['running']} berjalan, {info_render['queued']} antre "
+        f"(maks {info_render['workers']} proses)"
+    )
 
     # ============================
     # EDIT / DELETE
@@ -1387,19 +1063,29 @@ if not df.empty:
         with col2:
             edit_checkin = st.date_input("Check-in", selected_data["checkin"])
             edit_checkout = st.date_input("Check-out", selected_data["checkout"])
-            edit_harga = st.number_input(
-                "Harga per Malam",
-                value=int(selected_data["harga"]),
-                min_value=0
-            )
             edit_dp = st.number_input(
                 "DP",
                 value=int(selected_data["dp"]),
                 min_value=0
             )
     
-        malam = (edit_checkout - edit_checkin).days
-        edit_total = malam * edit_harga if malam > 0 else 0
+        # Harga dihitung ulang (engine yang sama dengan sidebar & simpan
+        # booking) hanya kalau kamar/tanggal berubah; edit nama/HP/DP
+        # tidak boleh mengubah total lama walaupun tarifnya sudah berubah
+        jadwal_berubah = (
+            edit_kamar != selected_data["kamar"]
+            or edit_checkin != selected_data["checkin"].date()
+            or edit_checkout != selected_data["checkout"].date()
+        )
+
+        if jadwal_berubah or pd.isna(selected_data["total"]):
+            edit_total = hitung_total_kamar(edit_kamar, edit_checkin, edit_checkout)
+        else:
+            edit_total = int(selected_data["total"])
+
+        # Sekalian memperbaiki booking lama yang tersimpan dengan harga 0
+        edit_harga = harga_rata_malam(edit_total, edit_checkin, edit_checkout)
+
         edit_sisa = edit_total - edit_dp
         edit_status = get_status(edit_checkin, edit_checkout, edit_sisa)
     
@@ -1419,36 +1105,24 @@ if not df.empty:
             if edit_checkout <= edit_checkin:
                 st.error("❌ Checkout harus setelah checkin!")
         
-            elif is_double_booking(edit_kamar, edit_checkin,
-                                   edit_checkout, selected_id):
+            elif not tampil_saran(st, edit_kamar, edit_checkin,
+                                  edit_checkout, selected_id):
                 st.error("❌ Jadwal bentrok dengan booking lain!")
         
             else:
                 try:
-                    with psycopg2.connect(
-                        st.secrets["DATABASE_URL"],
-                        sslmode="require"
-                    ) as conn:
-                        with conn.cursor() as cursor:
-                            cursor.execute("""
-                                UPDATE bookings
-                                SET nama=%s, hp=%s, kamar=%s,
-                                    checkin=%s, checkout=%s,
-                                    harga=%s, total=%s,
-                                    dp=%s, sisa=%s, status=%s
-                                WHERE id=%s
-                            """, (
-                                edit_nama, edit_hp, edit_kamar,
-                                edit_checkin, edit_checkout,
-                                edit_harga, edit_total,
-                                edit_dp, edit_sisa,
-                                edit_status,
-                                selected_id
-                            ))
-                            conn.commit()
+                    with db_conn() as conn:
+                        repository.update_booking(
+                            conn, int(selected_id),
+                            edit_nama, edit_hp, edit_kamar,
+                            edit_checkin, edit_checkout,
+                            edit_harga, edit_total,
+                            edit_dp, edit_sisa,
+                            edit_status
+                        )
         
                     st.success("✅ Booking berhasil diupdate!")
-                    st.cache_data.clear()
+                    invalidate_bookings([selected_id])
                     st.rerun()
         
                 except Exception as e:
@@ -1459,19 +1133,11 @@ if not df.empty:
         # =========================
         if delete_clicked:
             try:
-                with psycopg2.connect(
-                    st.secrets["DATABASE_URL"],
-                    sslmode="require"
-                ) as conn:
-                    with conn.cursor() as cursor:
-                        cursor.execute(
-                            "DELETE FROM bookings WHERE id=%s",
-                            (selected_id,)
-                        )
-                        conn.commit()
+                with db_conn() as conn:
+                    repository.delete_booking(conn, int(selected_id))
         
                 st.success("🗑️ Booking berhasil dihapus!")
-                st.cache_data.clear()
+                invalidate_bookings([selected_id])
                 st.session_state.selected_booking_id = None
                 st.rerun()
         
@@ -1499,22 +1165,154 @@ if not df.empty:
             if group_bookings.empty:
                 st.error("Data invoice tidak ditemukan.")
             else:
-                pdf = generate_invoice(group_bookings.to_dict("records"))
-                st.session_state.invoice_pdf = pdf
-                st.success("Invoice berhasil dibuat!")
+                records = group_bookings.to_dict("records")
+
+                # Invoice memuat tanggal hari ini, jadi ikut jadi bagian kunci
+                fp_invoice = f"{data_fingerprint(group_bookings)}-{date.today():%Y%m%d}"
+                pdf = report_cache_get("invoice", fp_invoice)
+
+                if pdf is None:
+                    from homestay.reports import generate_invoice
+                    pdf, _ = submit_render(("invoice", fp_invoice), generate_invoice, records)
+
+                if pdf is None:
+                    st.warning("Antrean laporan sedang penuh, coba lagi sebentar.")
+                else:
+                    st.session_state.invoice_pdf = (fp_invoice, pdf, time.perf_counter())
     
         except Exception as e:
             st.error(f"Error generate invoice: {e}")
-    
+
     if st.session_state.invoice_pdf is not None:
-        st.download_button(
-            label="📥 Download Invoice PDF",
-            data=st.session_state.invoice_pdf,
-            file_name=f"invoice_{selected_data['nama']}.pdf",
-            mime="application/pdf",
-            width="stretch"
-        )
+        fp_invoice, pdf, mulai_render = st.session_state.invoice_pdf
+
+        if isinstance(pdf, Future) and pdf.done():
+            try:
+                pdf = pdf.result()
+                report_cache_put("invoice", fp_invoice, pdf)
+                st.session_state.invoice_pdf = (fp_invoice, pdf, mulai_render)
+                st.success("Invoice berhasil dibuat!")
+            except Exception as e:
+                st.session_state.invoice_pdf = None
+                st.error(f"Error generate invoice: {e}")
+
+    if st.session_state.invoice_pdf is not None:
+        fp_invoice, pdf, mulai_render = st.session_state.invoice_pdf
+
+        if isinstance(pdf, Future):
+            pantau_render([pdf], mulai_render, "Membuat invoice")
+        else:
+            st.download_button(
+                label="📥 Download Invoice PDF",
+                data=pdf,
+                file_name=f"invoice_{selected_data['nama']}.pdf",
+                mime="application/pdf",
+                width="stretch"
+            )
         
+    # =========================
+    # INVOICE MASSAL
+    # =========================
+    with st.expander("🧾 Invoice Massal"):
+
+        mode_massal = st.radio(
+            "Pilih invoice",
+            ["Rentang tanggal checkin", "Semua grup belum lunas", "Daftar group ID"],
+            horizontal=True,
+            key="massal_mode"
+        )
+
+        if mode_massal == "Rentang tanggal checkin":
+            m1, m2 = st.columns(2)
+            massal_mulai = m1.date_input("Dari", date.today().replace(day=1), key="massal_mulai")
+            massal_sampai = m2.date_input("Sampai", date.today(), key="massal_sampai")
+
+        if mode_massal == "Daftar group ID":
+            massal_ids = st.text_input(
+                "Group ID (pisahkan dengan koma)",
+                key="massal_ids"
+            )
+
+        if st.button("Buat Semua Invoice", key="massal_buat"):
+            try:
+                if mode_massal == "Rentang tanggal checkin":
+                    sumber = query_bookings(
+                        mulai=massal_mulai,
+                        sampai=massal_sampai + timedelta(days=1)
+                    )
+                elif mode_massal == "Daftar group ID":
+                    sumber = query_groups(
+                        [g.strip() for g in massal_ids.split(",") if g.strip()]
+                    )
+                else:
+                    sumber = query_open_groups()
+
+                from homestay.reports import chunk_groups, invoice_groups, render_invoices
+
+                groups = invoice_groups(sumber)
+
+                if not groups:
+                    st.warning("Tidak ada booking untuk dibuatkan invoice.")
+                else:
+                    # Beberapa potongan per worker supaya progres terlihat
+                    batch = uuid.uuid4().hex
+                    kiriman = [
+                        submit_render(("invoice_massal", batch, i), render_invoices, chunk)
+                        for i, chunk in enumerate(
+                            chunk_groups(groups, RENDER_MAX_WORKERS * 2)
+                        )
+                    ]
+                    jobs = [job for job, _ in kiriman]
+
+                    if None in jobs:
+                        for job, dibuat in kiriman:
+                            if dibuat:
+                                job.cancel()
+                        st.warning("Antrean laporan sedang penuh, coba lagi sebentar.")
+                    else:
+                        st.session_state.invoice_massal = None
+                        st.session_state.invoice_massal_jobs = (jobs, time.perf_counter())
+
+            except Exception as e:
+                st.error(f"Error invoice massal: {e}")
+
+        if st.session_state.get("invoice_massal_jobs"):
+            jobs, mulai_render = st.session_state.invoice_massal_jobs
+
+            if all(job.done() for job in jobs):
+                st.session_state.invoice_massal_jobs = None
+
+                try:
+                    hasil = [row for job in jobs for row in job.result()]
+                    from homestay.reports import zip_invoices
+                    arsip_zip, timings = zip_invoices(hasil)
+                    st.session_state.invoice_massal = (
+                        arsip_zip, timings, time.perf_counter() - mulai_render
+                    )
+                except Exception as e:
+                    st.error(f"Error invoice massal: {e}")
+            else:
+                pantau_render(jobs, mulai_render, "Membuat invoice")
+
+        if st.session_state.get("invoice_massal"):
+            arsip_zip, timings, durasi = st.session_state.invoice_massal
+
+            st.caption(f"{len(timings)} invoice dalam {durasi:.1f} detik")
+
+            st.download_button(
+                label="📥 Download Semua Invoice (ZIP)",
+                data=arsip_zip,
+                file_name=f"invoice_{date.today():%Y%m%d}.zip",
+                mime="application/zip",
+                width="stretch"
+            )
+
+            st.dataframe(
+                pd.DataFrame(timings).sort_values("detik", ascending=False),
+                hide_index=True,
+                width="stretch"
+            )
+
     # ============================
     # RESET DATABASE
     # ============================
@@ -1528,17 +1326,10 @@ if not df.empty:
             try:
                 with st.spinner("Mereset database..."):
     
-                    with psycopg2.connect(
-                        st.secrets["DATABASE_URL"],
-                        sslmode="require"
-                    ) as conn:
-    
-                        with conn.cursor() as cursor:
-                            cursor.execute("DELETE FROM bookings;")
-                            cursor.execute("ALTER SEQUENCE bookings_id_seq RESTART WITH 1;")
-                            conn.commit()
+                    with db_conn() as conn:
+                        repository.reset_bookings(conn)
     
-                    st.cache_data.clear()
+                    reset_snapshot()
     
                 st.success("✅ Database berhasil direset!")
                 st.rerun()
@@ -1551,21 +1342,76 @@ if not df.empty:
     # ============================
     st.subheader("📊 Ringkasan")
 
+    tahun_list = load_tahun_booking() or [date.today().year]
+    tahun_kpi = st.selectbox("Tahun", tahun_list, key="tahun_kpi")
+
+    kpi = load_kpi(date(tahun_kpi, 1, 1), date(tahun_kpi + 1, 1, 1))
+    ringkas = ringkasan_kpi(kpi)
+
     colA, colB, colC = st.columns(3)
-    colA.metric("Total Booking", len(df))
-    colB.metric("Total Pendapatan", f"Rp {df['total'].sum():,.0f}")
-    colC.metric("Total DP Masuk", f"Rp {df['dp'].sum():,.0f}")
+    colA.metric("Total Booking", ringkas["booking"])
+    colB.metric("Total Pendapatan", f"Rp {ringkas['pendapatan']:,.0f}")
+    colC.metric("Total DP Masuk", f"Rp {ringkas['dp']:,.0f}")
+
+    colD, colE, colF, colG = st.columns(4)
+    colD.metric("Sisa Tagihan", f"Rp {ringkas['sisa']:,.0f}")
+    colE.metric("Okupansi", f"{ringkas['okupansi']:.0%}")
+    colF.metric("ADR", f"Rp {ringkas['adr']:,.0f}")
+    colG.metric("RevPAR", f"Rp {ringkas['revpar']:,.0f}")
 
     # ============================
     # GRAFIK
     # ============================
+    grafik = data_grafik(date(tahun_kpi, 1, 1), date(tahun_kpi + 1, 1, 1))
+
     st.subheader("📈 Grafik Pendapatan per Kamar")
-    chart_data = df.groupby("kamar")["total"].sum()
+    st.bar_chart(grafik["per_kamar"], y="Pendapatan", y_label="Total Pendapatan")
+
+    grafik1, grafik2 = st.columns(2)
+
+    with grafik1:
+        st.subheader("📈 Pendapatan per Bulan")
+        st.bar_chart(grafik["per_bulan"], y="Pendapatan")
 
-    fig, ax = plt.subplots()
-    chart_data.plot(kind="bar", ax=ax)
-    ax.set_ylabel("Total Pendapatan")
-    st.pyplot(fig)
+    with grafik2:
+        st.subheader("🛏 Okupansi per Kamar")
+        st.bar_chart(grafik["okupansi"], y="Okupansi (%)", horizontal=True)
+
+    st.subheader("💳 DP Masuk vs Sisa Tagihan")
+    st.bar_chart(grafik["dp_sisa"], y=["DP", "Sisa"], stack=True)
 
 else:
     st.info("Belum ada data booking.")
+    tampil_arsip()
+
+# ============================
+# WAKTU MUAT
+# ============================
+info_muat = startup_info()
+durasi_rerun = time.perf_counter() - rerun_mulai
+
+with info_muat["lock"]:
+    if info_muat["cold_start"] is None:
+        info_muat["cold_start"] = time.perf_counter() - info_muat["mulai"]
+    else:
+        info_muat["reruns"] += 1
+        info_muat["rerun_total"] += durasi_rerun
+        info_muat["rerun_max"] = max(info_muat["rerun_max"], durasi_rerun)
+
+    muat = dict(info_muat)
+
+with st.sidebar.expander("⏱️ Waktu Muat"):
+    st.write(f"Cold start: {muat['cold_start']:.2f} dtk (budget {BUDGET_COLD_START:.1f})")
+    st.write(f"Rerun ini: {durasi_rerun:.2f} dtk (budget {BUDGET_RERUN:.1f})")
+
+    if muat["reruns"]:
+        st.write(
+            f"Rerun: {muat['reruns']}x, rata-rata "
+            f"{muat['rerun_total'] / muat['reruns']:.2f} dtk, maks {muat['rerun_max']:.2f} dtk"
+        )
+
+    if muat["cold_start"] > BUDGET_COLD_START:
+        st.warning("Cold start melebihi budget.")
+
+    if muat["reruns"] and durasi_rerun > BUDGET_RERUN:
+        st.warning("Rerun ini melebihi budget.")
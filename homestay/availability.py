@@ -0,0 +1,202 @@
+"""
+Bitmap okupansi kamar × tanggal & pencarian kamar/tanggal kosong.
+
+Semua fungsi bekerja pada dict grid dari okupansi_baru(); pemanggil yang
+bertanggung jawab atas locking & sinkronisasi dengan database.
+"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Panjang bitmap dari awal jendela (± 3 bulan lalu s/d ± 21 bulan ke depan).
+# Tanggal di luar rentang ini harus dicek langsung ke database.
+OKUPANSI_HARI = 2 * 365
+
+# Saran tanggal dicari sampai sejauh ini sebelum/sesudah tanggal yang diminta
+SARAN_RENTANG_HARI = 30
+
+def bulan_berikutnya(d):
+    return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+def okupansi_baru(mulai, df):
+    """
+    Bitmap okupansi kamar × tanggal dari snapshot booking.
+
+    terisi[r, d] = jumlah booking yang menempati kamar r pada malam
+    mulai + d hari (checkin ≤ malam < checkout). span menyimpan posisi
+    tiap booking supaya edit/hapus cukup mengurangi potongannya saja.
+    """
+    grid = {
+        "mulai": np.datetime64(mulai, "D"),
+        "kamar": {},
+        "terisi": np.zeros((0, OKUPANSI_HARI), dtype=np.int16),
+        "span": {},
+    }
+    okupansi_tambah(grid, df)
+    return grid
+
+def okupansi_tambah(grid, df):
+    if grid is None or df.empty:
+        return
+
+    for kamar in df["kamar"].unique():
+        if kamar not in grid["kamar"]:
+            grid["kamar"][kamar] = len(grid["kamar"])
+            grid["terisi"] = np.vstack([
+                grid["terisi"], np.zeros((1, OKUPANSI_HARI), dtype=np.int16)
+            ])
+
+    rows = df["kamar"].map(grid["kamar"]).to_numpy()
+    a = (df["checkin"].to_numpy(dtype="datetime64[D]") - grid["mulai"]).astype(int)
+    b = (df["checkout"].to_numpy(dtype="datetime64[D]") - grid["mulai"]).astype(int)
+    a = np.clip(a, 0, OKUPANSI_HARI)
+    b = np.clip(b, a, OKUPANSI_HARI)
+
+    # Difference array: +1 di checkin, -1 di checkout, lalu cumsum per kamar
+    diff = np.zeros((len(grid["kamar"]), OKUPANSI_HARI + 1), dtype=np.int16)
+    np.add.at(diff, (rows, a), 1)
+    np.add.at(diff, (rows, b), -1)
+    grid["terisi"] += np.cumsum(diff[:, :-1], axis=1, dtype=np.int16)
+
+    grid["span"].update(zip(df["id"].astype(int), zip(rows, a, b)))
+
+def okupansi_hapus(grid, ids):
+    if grid is None:
+        return
+
+    for booking_id in ids:
+        span = grid["span"].pop(int(booking_id), None)
+
+        if span is not None:
+            r, a, b = span
+            grid["terisi"][r, a:b] -= 1
+
+def _posisi(grid, checkin, checkout):
+    """Index [a, b) di bitmap, atau None kalau di luar rentang."""
+    a = int((np.datetime64(checkin, "D") - grid["mulai"]).astype(int))
+    b = int((np.datetime64(checkout, "D") - grid["mulai"]).astype(int))
+
+    if 0 <= a < b <= OKUPANSI_HARI:
+        return a, b
+    return None
+
+def kamar_kosong(grid, kamar_list, checkin, checkout):
+    """
+    Kamar dari kamar_list yang kosong semua malam [checkin, checkout).
+
+    Return None kalau rentang di luar bitmap (cek ke database).
+    """
+    posisi = _posisi(grid, checkin, checkout)
+
+    if posisi is None:
+        return None
+
+    a, b = posisi
+    terisi = grid["terisi"][:, a:b].any(axis=1)
+
+    return [
+        k for k in kamar_list
+        if k not in grid["kamar"] or not terisi[grid["kamar"][k]]
+    ]
+
+def _baris_terisi(grid, kamar, booking_id=None):
+    """Malam terisi 1 kamar (bool per hari); booking_id sendiri tidak dihitung."""
+    r = grid["kamar"].get(kamar)
+
+    if r is None:
+        return np.zeros(OKUPANSI_HARI, dtype=bool)
+
+    row = grid["terisi"][r].copy()
+    span = grid["span"].get(int(booking_id)) if booking_id is not None else None
+
+    if span is not None and span[0] == r:
+        row[span[1]:span[2]] -= 1
+
+    return row > 0
+
+def cari_ketersediaan(grid, tarif, kamar, checkin, checkout,
+                      booking_id=None, jumlah=3, today=None):
+    """
+    Cek 1 kamar dan, kalau bentrok, cari alternatifnya.
+
+    tarif : {kamar: tarif weekday}, untuk mengurutkan kamar lain
+
+    Return dict:
+        tersedia     : kamar kosong di [checkin, checkout)
+        kamar_lain   : kamar lain yang kosong di tanggal sama, urut tarif
+                       paling mirip
+        tanggal_lain : maksimal `jumlah` (checkin, checkout) dengan lama
+                       menginap sama di kamar ini, paling dekat ke tanggal
+                       yang diminta (±SARAN_RENTANG_HARI, tidak sebelum hari ini)
+
+    atau None kalau rentang di luar bitmap.
+    """
+    posisi = _posisi(grid, checkin, checkout)
+
+    if posisi is None:
+        return None
+
+    a, b = posisi
+    hari_ini = int((np.datetime64(today or date.today(), "D") - grid["mulai"]).astype(int))
+
+    hasil = {"tersedia": True, "kamar_lain": [], "tanggal_lain": []}
+
+    terisi = _baris_terisi(grid, kamar, booking_id)
+    hasil["tersedia"] = not terisi[a:b].any()
+
+    if hasil["tersedia"]:
+        return hasil
+
+    hasil["kamar_lain"] = sorted(
+        (
+            k for k in tarif
+            if k != kamar and not _baris_terisi(grid, k, booking_id)[a:b].any()
+        ),
+        key=lambda k: abs(int(tarif[k]) - int(tarif.get(kamar, 0)))
+    )
+
+    # Jendela n malam yang kosong: jumlah malam terisi di jendela = 0
+    n = b - a
+    kumulatif = np.concatenate([[0], np.cumsum(terisi)])
+    starts = np.arange(
+        max(a - SARAN_RENTANG_HARI, hari_ini, 0),
+        min(a + SARAN_RENTANG_HARI, OKUPANSI_HARI - n) + 1
+    )
+    starts = starts[kumulatif[starts + n] == kumulatif[starts]]
+    starts = starts[np.argsort(np.abs(starts - a), kind="stable")][:jumlah]
+
+    mulai = grid["mulai"]
+    hasil["tanggal_lain"] = [
+        (
+            (mulai + np.timedelta64(int(i), "D")).astype(date),
+            (mulai + np.timedelta64(int(i) + n, "D")).astype(date),
+        )
+        for i in starts
+    ]
+
+    return hasil
+
+def okupansi_bulan(grid, kamar_list, bulan):
+    """DataFrame bool kamar × tanggal untuk 1 bulan (bulan = tanggal 1)."""
+    hari = np.arange(
+        np.datetime64(bulan, "D"),
+        np.datetime64(bulan_berikutnya(bulan), "D")
+    )
+    terisi = np.zeros((len(kamar_list), len(hari)), dtype=bool)
+
+    if grid is not None:
+        idx = (hari - grid["mulai"]).astype(int)
+        ada = (idx >= 0) & (idx < OKUPANSI_HARI)
+
+        for i, kamar in enumerate(kamar_list):
+            r = grid["kamar"].get(kamar)
+            if r is not None:
+                terisi[i, ada] = grid["terisi"][r, idx[ada]] > 0
+
+    return pd.DataFrame(
+        terisi,
+        index=kamar_list,
+        columns=pd.DatetimeIndex(hari).day
+    )
@@ -0,0 +1,30 @@
+"""
+Format angka & tanggal booking.
+
+Ringan (hanya pandas), dipakai tampilan maupun laporan tanpa ikut
+meng-import ReportLab/xlsxwriter.
+"""
+
+import pandas as pd
+
+MONEY_COLUMNS = ["harga", "total", "dp", "sisa"]
+DATE_COLUMNS = ["checkin", "checkout"]
+
+def rupiah(x):
+    return f"Rp {int(x):,}".replace(",", ".")
+
+def format_rupiah(values):
+    """
+    Series angka → "Rp 1.234.567" dalam 1 pass vectorized.
+
+    Nilai yang bukan angka dibiarkan apa adanya.
+    """
+    angka = pd.to_numeric(values, errors="coerce")
+
+    teks = (
+        "Rp "
+        + angka.round().astype("Int64").astype(str)
+        .str.replace(r"\B(?=(\d{3})+(?!\d))", ".", regex=True)
+    )
+
+    return teks.where(angka.notna(), values)
@@ -0,0 +1,147 @@
+"""
+Kalender harga & perhitungan harga menginap.
+
+Tarif dasar, tarif musiman & hari libur (lihat migrations/006_rate_plans.sql)
+di-"bake" ke 1 array harga per malam (kamar × tanggal) + cumulative sum,
+jadi harga menginap berapa malam pun = 2 lookup.
+"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Rentang kalender: 1 tahun ke belakang s/d 2 tahun ke depan.
+# Di luar rentang ini dipakai tarif dasar saja.
+KALENDER_TAHUN_MUNDUR = 1
+KALENDER_TAHUN_MAJU = 2
+
+# Weekend = Jumat, Sabtu, Minggu. Urutan mask: Senin ... Minggu
+MASK_WEEKDAY = "1111000"
+MASK_WEEKEND = "0000111"
+
+def build_price_calendar(rooms, musiman, libur, versi, tahun):
+    """
+    Bangun kalender harga dari tabel tarif.
+
+    rooms   : nama_kamar, harga, harga_weekend (kamar aktif)
+    musiman : id, kamar (NULL = semua), mulai, selesai, harga_weekday, harga_weekend, ...
+    libur   : tanggal, nama, tambahan
+    """
+    kamar = rooms["nama_kamar"].tolist()
+    index = {k: i for i, k in enumerate(kamar)}
+
+    tarif_weekday = rooms["harga"].fillna(0).to_numpy(dtype=np.int64)
+    tarif_weekend = rooms["harga_weekend"].fillna(0).to_numpy(dtype=np.int64)
+
+    start = np.datetime64(date(tahun - KALENDER_TAHUN_MUNDUR, 1, 1), "D")
+    end = np.datetime64(date(tahun + KALENDER_TAHUN_MAJU + 1, 1, 1), "D")
+    hari = np.arange(start, end, dtype="datetime64[D]")
+    weekend = ~np.is_busday(hari, weekmask=MASK_WEEKDAY)
+
+    harga = np.where(weekend, tarif_weekend[:, None], tarif_weekday[:, None])
+
+    for o in musiman.itertuples(index=False):
+        if pd.isna(o.kamar):
+            rows = slice(None)
+        elif o.kamar in index:
+            rows = index[o.kamar]
+        else:
+            continue
+
+        a = max(int((np.datetime64(o.mulai, "D") - start).astype(int)), 0)
+        b = min(int((np.datetime64(o.selesai, "D") - start).astype(int)) + 1, len(hari))
+
+        if a < b:
+            harga[rows, a:b] = np.where(weekend[a:b], o.harga_weekend, o.harga_weekday)
+
+    for l in libur.itertuples(index=False):
+        i = int((np.datetime64(l.tanggal, "D") - start).astype(int))
+        if 0 <= i < len(hari):
+            harga[:, i] += l.tambahan
+
+    cumsum = np.zeros((len(kamar), len(hari) + 1), dtype=np.int64)
+    cumsum[:, 1:] = harga.cumsum(axis=1)
+
+    return {
+        "versi": versi,
+        "start": start,
+        "kamar": kamar,
+        "index": index,
+        "tarif_weekday": tarif_weekday,
+        "tarif_weekend": tarif_weekend,
+        "harga": harga,
+        "cumsum": cumsum,
+        "musiman": musiman,
+        "libur": libur,
+    }
+
+def hitung_malam(checkin, checkout):
+    """
+    Jumlah malam weekday & weekend di [checkin, checkout).
+
+    Dihitung aritmetis dengan np.busday_count, bukan loop per hari.
+    Bisa scalar atau array tanggal (hasilnya ikut bentuk input).
+    """
+    checkin = np.asarray(checkin, dtype="datetime64[D]")
+    checkout = np.asarray(checkout, dtype="datetime64[D]")
+
+    malam_weekday = np.busday_count(checkin, checkout, weekmask=MASK_WEEKDAY)
+    malam_weekend = np.busday_count(checkin, checkout, weekmask=MASK_WEEKEND)
+
+    # checkout <= checkin → 0 malam (busday_count memberi angka negatif)
+    return np.maximum(malam_weekday, 0), np.maximum(malam_weekend, 0)
+
+def hitung_harga(kal, kamar, checkin, checkout):
+    """
+    Harga banyak (kamar, checkin, checkout) dalam 1 panggilan.
+
+    Semua argumen boleh list/array (di-broadcast), misalnya semua kamar
+    yang dipilih untuk tanggal yang sama. Return array total per baris.
+    """
+    rows = np.array([kal["index"][k] for k in np.atleast_1d(kamar)], dtype=np.intp)
+    checkin = np.asarray(checkin, dtype="datetime64[D]")
+    checkout = np.asarray(checkout, dtype="datetime64[D]")
+
+    a = (checkin - kal["start"]).astype(np.int64)
+    b = np.maximum((checkout - kal["start"]).astype(np.int64), a)
+    rows, a, b = np.broadcast_arrays(rows, a, b)
+
+    # Fallback tarif dasar untuk tanggal di luar rentang kalender
+    malam_weekday, malam_weekend = hitung_malam(checkin, checkout)
+    total = (
+        malam_weekday * kal["tarif_weekday"][rows]
+        + malam_weekend * kal["tarif_weekend"][rows]
+    )
+
+    in_range = (a >= 0) & (b < kal["cumsum"].shape[1])
+    total[in_range] = (
+        kal["cumsum"][rows[in_range], b[in_range]]
+        - kal["cumsum"][rows[in_range], a[in_range]]
+    )
+
+    return total
+
+def harga_rata_malam(total, checkin, checkout):
+    """Harga rata-rata per malam untuk kolom harga (total / jumlah malam, dibulatkan)."""
+    malam = (checkout - checkin).days
+    return round(total / malam) if malam > 0 else 0
+
+def hitung_total_kamar(kal, kamar, checkin, checkout):
+    return int(hitung_harga(kal, [kamar], checkin, checkout)[0])
+
+def rincian_harga(kal, kamar, checkin, checkout):
+    """[(harga per malam, jumlah malam), ...] untuk rincian di sidebar."""
+    a = int((np.datetime64(checkin, "D") - kal["start"]).astype(int))
+    b = int((np.datetime64(checkout, "D") - kal["start"]).astype(int))
+
+    if a < 0 or b >= kal["cumsum"].shape[1]:
+        malam_weekday, malam_weekend = hitung_malam(checkin, checkout)
+        i = kal["index"][kamar]
+        return [
+            (int(kal["tarif_weekday"][i]), int(malam_weekday)),
+            (int(kal["tarif_weekend"][i]), int(malam_weekend)),
+        ]
+
+    harga, jumlah = np.unique(kal["harga"][kal["index"][kamar], a:b], return_counts=True)
+    return list(zip(harga.tolist(), jumlah.tolist()))
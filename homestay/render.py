@@ -0,0 +1,194 @@
+"""
+Orkestrasi render laporan: process pool bersama, dedup job, laporan PDF
+per bulan & cache disk.
+
+Modul reports (ReportLab, xlsxwriter, pypdf) baru di-import saat job
+pertama dikirim, jadi import modul ini tetap ringan.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from .report_cache import data_fingerprint, report_cache_get, report_cache_put
+
+# Layout ReportLab berat di CPU & memegang GIL, jadi dijalankan di
+# proses terpisah. Jumlah worker dibatasi untuk semua pemakai sekaligus.
+RENDER_MAX_WORKERS = max(1, min(os.cpu_count() or 1, 4))
+
+# Maksimal job yang antre + berjalan; lebih dari ini ditolak
+RENDER_MAX_JOBS = RENDER_MAX_WORKERS * 4
+
+# Nama fungsi di homestay.reports untuk laporan 1 dokumen
+REPORT_BUILDERS = {
+    "excel": "generate_excel",
+    "pdf": "generate_pdf",
+    "public": "generate_pdf_public",
+}
+
+def create_executor(max_workers=RENDER_MAX_WORKERS, max_jobs=RENDER_MAX_JOBS):
+    """
+    Process pool + antrean terbatas + tabel job yang sedang berjalan.
+
+    Worker dibuat dengan forkserver & langsung mendaftarkan font
+    (warm_worker), jadi job pertama tidak menanggung biaya itu.
+    Job dengan kunci yang sama (laporan + fingerprint) berbagi 1 future.
+    """
+    from . import reports
+
+    return {
+        "executor": ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=reports.mp_context(),
+            initializer=reports.warm_worker,
+        ),
+        "workers": max_workers,
+        "slots": threading.BoundedSemaphore(max_jobs),
+        "lock": threading.Lock(),
+        "inflight": {},
+    }
+
+def submit_render(ex, key, fn, *args):
+    """
+    Kirim job ke executor. Return (Future, dibuat), atau (None, False)
+    kalau antrean penuh.
+
+    key    : kunci dedup; pemanggil lain yang minta key sama dapat future yang sama.
+    dibuat : False kalau future milik job yang sudah berjalan (jangan di-cancel).
+    """
+    with ex["lock"]:
+        future = ex["inflight"].get(key)
+        if future is not None:
+            return future, False
+
+        if not ex["slots"].acquire(blocking=False):
+            return None, False
+
+        future = ex["executor"].submit(fn, *args)
+        ex["inflight"][key] = future
+
+    def selesai(_):
+        with ex["lock"]:
+            ex["inflight"].pop(key, None)
+        ex["slots"].release()
+
+    future.add_done_callback(selesai)
+    return future, True
+
+def render_info(ex):
+    with ex["lock"]:
+        jobs = list(ex["inflight"].values())
+
+    return {
+        "workers": ex["workers"],
+        "running": sum(f.running() for f in jobs),
+        "queued": sum(not f.running() and not f.done() for f in jobs),
+    }
+
+def submit_bulanan(ex, df, rekap):
+    """
+    Laporan PDF per bulan: sampul (rekap monthly_summary) dan setiap bulan
+    di-layout sebagai dokumen sendiri di worker, paralel. Bulan yang isinya
+    tidak berubah diambil dari cache ("bulan"), jadi setelah 1 booking baru
+    cuma sampul & bulan itu yang dirender.
+
+    Return [(fingerprint bagian, bytes atau Future), ...] urut halaman,
+    atau None kalau antrean penuh.
+    """
+    from . import reports
+
+    bagian = [("sampul", data_fingerprint(rekap), reports.render_sampul, (rekap,))]
+
+    for nama_bulan, group_export in reports.bagian_bulanan(df):
+        bagian.append((
+            "bulan",
+            f"{data_fingerprint(group_export)}-{nama_bulan}",
+            reports.render_bulan,
+            (nama_bulan, group_export),
+        ))
+
+    parts = []
+    dibuat_sendiri = []
+
+    for jenis, fp_bagian, fn, args in bagian:
+        kunci = f"{jenis}-{fp_bagian}"
+        data = report_cache_get("bulan", kunci)
+
+        if data is None:
+            data, dibuat = submit_render(ex, ("bulan", kunci), fn, *args)
+
+            if data is None:
+                # Hanya job dari panggilan ini; future hasil dedup bisa
+                # milik laporan pemanggil lain yang masih menunggu
+                for job in dibuat_sendiri:
+                    job.cancel()
+                return None
+
+            if dibuat:
+                dibuat_sendiri.append(data)
+
+        parts.append((kunci, data))
+
+    return parts
+
+def build_report(ex, jenis, fingerprint, df, load_rekap=None):
+    """
+    Laporan dari cache disk kalau ada (return bytes). Kalau tidak, job
+    dikirim ke worker dan yang dikembalikan list [(kunci, bytes/Future)]
+    untuk diselesaikan finish_report; None kalau antrean penuh.
+
+    load_rekap : fungsi tanpa argumen → rekap per bulan untuk sampul PDF,
+                 hanya dipanggil kalau PDF memang harus dirender. None →
+                 rekap dihitung dari df (reports.rekap_bulanan).
+    """
+    data = report_cache_get(jenis, fingerprint)
+
+    if data is not None:
+        return data
+
+    from . import reports
+
+    if jenis == "pdf":
+        rekap = reports.rekap_bulanan(df) if load_rekap is None else load_rekap()
+        return submit_bulanan(ex, df, rekap)
+
+    job, _ = submit_render(ex, (jenis, fingerprint), getattr(reports, REPORT_BUILDERS[jenis]), df)
+    return None if job is None else [(None, job)]
+
+def finish_report(jenis, fingerprint, parts):
+    """Ambil hasil semua job, simpan bagian per bulan, gabungkan & cache laporannya."""
+    hasil = []
+
+    for fp_bulan, part in parts:
+        if isinstance(part, Future):
+            part = part.result()
+
+            if fp_bulan is not None:
+                report_cache_put("bulan", fp_bulan, part)
+
+        hasil.append(part)
+
+    if jenis == "pdf":
+        from .reports import gabung_pdf
+        data = gabung_pdf(hasil)
+    else:
+        data = hasil[0]
+    report_cache_put(jenis, fingerprint, data)
+    return data
+
+def render_report(ex, jenis, df, load_rekap=None):
+    """
+    Buat 1 laporan sampai selesai (menunggu worker), untuk CLI & benchmark.
+
+    Return bytes; raise RuntimeError kalau antrean executor penuh.
+    """
+    fingerprint = data_fingerprint(df)
+    hasil = build_report(ex, jenis, fingerprint, df, load_rekap)
+
+    if hasil is None:
+        raise RuntimeError("Antrean render penuh")
+
+    if isinstance(hasil, list):
+        return finish_report(jenis, fingerprint, hasil)
+
+    return hasil
@@ -0,0 +1,126 @@
+"""
+Cache laporan di disk (LRU) + fingerprint data sebagai kuncinya.
+
+Tidak meng-import ReportLab/xlsxwriter, jadi bisa dicek tiap rerun
+tanpa memuat modul reports.
+"""
+
+import hashlib
+import os
+import threading
+import uuid
+
+import pandas as pd
+
+# Naikkan kalau tampilan laporan berubah, supaya file lama tidak dipakai lagi
+REPORT_TEMPLATE_VERSION = 7
+
+REPORT_CACHE_DIR = ".cache/laporan"
+REPORT_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+REPORT_EXT = {
+    "excel": "xlsx",
+}
+
+# Statistik per proses
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+
+def data_fingerprint(df):
+    """Hash isi DataFrame (kolom, index & nilai) untuk kunci cache laporan."""
+    h = hashlib.sha1()
+    h.update("|".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+def _evict_report_cache():
+    """Hapus file paling lama tidak dipakai sampai total ukuran di bawah batas."""
+    files = []
+
+    for entry in os.scandir(REPORT_CACHE_DIR):
+        if entry.is_file() and not entry.name.startswith("."):
+            info = entry.stat()
+            files.append((info.st_mtime, info.st_size, entry.path))
+
+    total = sum(size for _, size, _ in files)
+    evicted = 0
+
+    for _, size, path in sorted(files):
+        if total <= REPORT_CACHE_MAX_BYTES:
+            break
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+        total -= size
+        evicted += 1
+
+    return evicted
+
+def _report_path(jenis, fingerprint):
+    ext = REPORT_EXT.get(jenis, "pdf")
+    return os.path.join(
+        REPORT_CACHE_DIR,
+        f"{jenis}-{fingerprint}-v{REPORT_TEMPLATE_VERSION}.{ext}"
+    )
+
+def report_cache_get(jenis, fingerprint):
+    """
+    Isi laporan dari cache disk, atau None.
+
+    Kunci = (jenis laporan, fingerprint data, versi template), jadi file
+    yang sama dipakai ulang lintas sesi & user. Setiap hit memperbarui
+    mtime (LRU).
+    """
+    path = _report_path(jenis, fingerprint)
+
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+
+        os.utime(path)
+
+        with _stats_lock:
+            _stats["hits"] += 1
+        return data
+
+    except FileNotFoundError:
+        with _stats_lock:
+            _stats["misses"] += 1
+        return None
+
+def report_cache_put(jenis, fingerprint, data):
+    """
+    Simpan laporan ke cache disk. Kalau total cache melewati
+    REPORT_CACHE_MAX_BYTES, file yang paling lama tidak dipakai dihapus.
+    """
+    if not data:
+        return
+
+    os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+
+    # Tulis ke file sementara dulu supaya sesi lain tidak membaca file setengah jadi
+    tmp = os.path.join(REPORT_CACHE_DIR, f".{uuid.uuid4().hex}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, _report_path(jenis, fingerprint))
+
+    evicted = _evict_report_cache()
+
+    with _stats_lock:
+        _stats["evictions"] += evicted
+
+def report_cache_info():
+    with _stats_lock:
+        info = dict(_stats)
+
+    try:
+        info["bytes"] = sum(
+            e.stat().st_size for e in os.scandir(REPORT_CACHE_DIR) if e.is_file()
+        )
+    except FileNotFoundError:
+        info["bytes"] = 0
+
+    return info
@@ -0,0 +1,841 @@
+"""
+Pembuatan laporan Excel, PDF & invoice.
+
+Tidak bergantung pada Streamlit maupun database, dan tidak melakukan
+apa-apa saat di-import, jadi aman dipakai worker process untuk render
+paralel.
+"""
+
+import functools
+import multiprocessing
+import os
+import time
+import zipfile
+from datetime import datetime
+from io import BytesIO
+
+import pandas as pd
+import xlsxwriter
+from pypdf import PdfWriter
+from reportlab.lib import colors, pagesizes
+from reportlab.lib.colors import Color
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import cm, inch
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Flowable, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from .formatting import DATE_COLUMNS, MONEY_COLUMNS, format_rupiah, rupiah
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+
+FONTS = {
+    "Playfair-Bold": "pairflay/PlayfairDisplay-Bold.ttf",
+    "Poppins-Regular": "poppins/Poppins-Regular.ttf",
+    "Poppins-Light": "poppins/Poppins-Light.ttf",
+}
+
+# ============================
+# TEMPLATE LAPORAN (REPORTLAB)
+# ============================
+
+# Warna status dipakai bersama PDF, Excel & tabel di layar
+STATUS_COLORS = {
+    "Booked": "#FFF3B0",
+    "Check-in": "#B6F2B6",
+    "Check-out": "#A0E7FF",
+    "Selesai": "#D3D3D3",
+    "Lunas": "#C8F7C5",
+}
+
+ALAMAT_LENGKAP = "Jl. Raya Lingkar Barat Gading Fajar 2 Blok C5 No 28 Kota Sidoarjo - Jawa Timur"
+KONTAK = "Telp: 081231646523 (Bu Yanie) | Website: www.alvirahomestay.com"
+
+@functools.lru_cache(maxsize=None)
+def register_fonts():
+    for name, path in FONTS.items():
+        pdfmetrics.registerFont(TTFont(name, os.path.join(ASSETS_DIR, path)))
+
+@functools.lru_cache(maxsize=None)
+def report_template():
+    """
+    Font, style, logo & TableStyle laporan, dibuat sekali per proses.
+
+    Logo di-decode sekali ke ImageReader; setiap dokumen cuma
+    menggambar ulang data yang sudah di-decode.
+    """
+    register_fonts()
+
+    styles = getSampleStyleSheet()
+
+    logo = ImageReader(os.path.join(ASSETS_DIR, "logo.png"))
+    logo.getRGBData()
+
+    return {
+        "styles": styles,
+        "logo": logo,
+
+        "title": ParagraphStyle(
+            "TitleStyle",
+            parent=styles["Normal"],
+            fontName="Playfair-Bold",
+            fontSize=20,
+            leading=24,
+            textColor=colors.HexColor("#1B5E20"),
+            alignment=1,
+            spaceAfter=5
+        ),
+        "subtitle": ParagraphStyle(
+            "SubtitleStyle",
+            parent=styles["Normal"],
+            fontSize=12,
+            leading=16,
+            textColor=colors.black,
+            alignment=1,
+            spaceAfter=6
+        ),
+        "info": ParagraphStyle(
+            "InfoStyle",
+            parent=styles["Normal"],
+            fontName="Poppins-Regular",
+            fontSize=8,
+            leading=10,
+            textColor=colors.grey,
+            alignment=1,
+            spaceAfter=3
+        ),
+        "disclaimer": ParagraphStyle(
+            "Disclaimer",
+            parent=styles["Normal"],
+            fontSize=9,
+            textColor=colors.HexColor("#C0392B")
+        ),
+        "invoice_title": ParagraphStyle(
+            "BrandTitle",
+            parent=styles["Heading1"],
+            fontSize=16,
+            textColor=colors.HexColor("#1B5E20"),
+            spaceAfter=4
+        ),
+        "invoice_info": ParagraphStyle(
+            "InvoiceInfoStyle",
+            parent=styles["Normal"],
+            fontSize=8,
+            textColor=colors.grey,
+            leading=10
+        ),
+
+        "header_style": TableStyle([
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+
+            # Logo kolom 0
+            ("LEFTPADDING", (0,0), (0,0), 0),
+
+            # Text kolom 1 → geser ke kanan
+            ("LEFTPADDING", (1,0), (1,0), 20),
+
+            ("RIGHTPADDING", (0,0), (-1,-1), 6),
+            ("TOPPADDING", (0,0), (-1,-1), 6),
+            ("BOTTOMPADDING", (0,0), (-1,-1), 6),
+        ]),
+        "invoice_header_style": TableStyle([
+            ("VALIGN", (0,0), (-1,-1), "TOP"),
+            ("LEFTPADDING", (1,0), (1,0), 0),
+            ("LEFTPADDING", (2,0), (2,0), 30),
+            ("RIGHTPADDING", (0,0), (-1,-1), 0),
+        ]),
+        "gold_line_style": TableStyle([
+            ('LINEBELOW', (0,0), (-1,-1), 1, colors.HexColor("#C6A700"))
+        ]),
+        "status_colors": {
+            status: colors.HexColor(warna) for status, warna in STATUS_COLORS.items()
+        },
+    }
+
+class Logo(Flowable):
+    """Logo dari ImageReader yang sudah di-decode (pengganti RLImage per dokumen)."""
+
+    def __init__(self, width, height):
+        super().__init__()
+        self.width = width
+        self.height = height
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.drawImage(
+            report_template()["logo"], 0, 0,
+            self.width, self.height, mask="auto"
+        )
+
+def header_laporan(judul):
+    """Header laporan booking: logo, nama homestay, judul, alamat + garis emas."""
+    t = report_template()
+
+    header_text = [
+        Paragraph("<b>HOMESTAY ALVIRA SIDOARJO</b>", t["title"]),
+        Spacer(1, 2),  # 🔥 tambahan jarak manual
+        Paragraph(f"<b>{judul}</b>", t["subtitle"]),
+        Spacer(1, 4),  # 🔥 tambahan jarak manual
+        Paragraph(ALAMAT_LENGKAP, t["info"]),
+        Paragraph(KONTAK, t["info"]),
+    ]
+
+    header_table = Table(
+        [[Logo(1.3*inch, 1.3*inch), header_text]],
+        colWidths=[3*cm, 12*cm]
+    )
+    header_table.setStyle(t["header_style"])
+
+    gold_line = Table([[""]], colWidths=[17*cm])
+    gold_line.setStyle(t["gold_line_style"])
+
+    return [header_table, Spacer(1, 6), gold_line, Spacer(1, 15)]
+
+def header_invoice(invoice_number):
+    """Header invoice: logo, identitas homestay, nomor & tanggal invoice."""
+    t = report_template()
+    styles = t["styles"]
+
+    header_left = [
+        Paragraph("<b>HOMESTAY ALVIRA SIDOARJO</b>", t["invoice_title"]),
+        Paragraph("Jl. Raya Lingkar Barat Gading Fajar 2 Blok C5 No 28", t["invoice_info"]),
+        Paragraph("Sidoarjo - Jawa Timur", t["invoice_info"]),
+        Paragraph("Telp: 081231646523", t["invoice_info"]),
+    ]
+
+    header_right = [
+        Paragraph("<b>INVOICE</b>", styles["Title"]),
+        Spacer(1, 6),
+        Paragraph(f"Invoice #: INV-{datetime.now().year}-{invoice_number}", styles["Normal"]),
+        Paragraph(f"Date: {datetime.now().strftime('%d %b %Y')}", styles["Normal"]),
+    ]
+
+    header_table = Table(
+        [[Logo(1.1*inch, 1.1*inch), header_left, header_right]],
+        colWidths=[1.3*inch, 3.2*inch, 2.3*inch]
+    )
+    header_table.setStyle(t["invoice_header_style"])
+
+    return [header_table, Spacer(1, 25)]
+
+def tabel_bulan(group_export):
+    """Tabel 1 bulan dengan header hijau & kolom status berwarna."""
+    t = report_template()
+
+    data = [group_export.columns.tolist()] + group_export.values.tolist()
+
+    table = Table(data, repeatRows=1)
+
+    style = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#1E8449")),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor("#C8A951")),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ]
+
+    # Warna status
+    if "status" in group_export.columns:
+        status_index = group_export.columns.get_loc("status")
+
+        for i, status in enumerate(group_export["status"], start=1):
+            warna = t["status_colors"].get(status)
+            if warna is not None:
+                style.append(('BACKGROUND', (status_index, i), (status_index, i), warna))
+
+    table.setStyle(style)
+    return table
+
+def add_watermark(canvas, doc):
+    canvas.saveState()
+
+    # Transparansi sangat tipis
+    canvas.setFillAlpha(0.015)
+
+    # Abu-abu sangat soft
+    canvas.setFillColor(colors.HexColor("#BDBDBD"))
+
+    # Font lebih ringan & sedikit lebih kecil
+    canvas.setFont("Helvetica-Bold", 55)
+
+    width, height = doc.pagesize
+    canvas.translate(width / 2, height / 2)
+    canvas.rotate(45)
+
+    canvas.drawCentredString(0, 0, "HOMESTAY ALVIRA")
+
+    canvas.restoreState()
+
+def draw_bottom_text(canvas, text, center_x, center_y, radius):
+    angle_step = 10  # Diubah ke 10 derajat untuk jarak antar huruf yang lebih dekat
+    angle = -50  # Diubah ke -75 untuk geser ke kanan menyamping agar tidak bertabrakan dengan "ALVIRA HOMESTAY"
+
+    for char in text:
+        canvas.saveState()
+        canvas.translate(center_x, center_y)
+        canvas.rotate(angle)
+        canvas.drawCentredString(0, -radius, char)
+        canvas.restoreState()
+        angle += angle_step
+
+def draw_top_text(canvas, text, center_x, center_y, radius):
+    angle_step = 180 / len(text)
+    angle = 90
+
+    for char in text:
+        canvas.saveState()
+        canvas.translate(center_x, center_y)
+        canvas.rotate(angle)
+        canvas.drawCentredString(0, radius, char)
+        canvas.restoreState()
+        angle -= angle_step
+
+def add_lunas_watermark(canvas, doc):
+    canvas.saveState()
+
+    width, height = doc.pagesize
+    x = width / 2
+    y = height / 2 - 100  # Posisi diturunkan agar tidak mengganggu tabel
+
+    # Warna merah transparan yang lebih halus
+    red_transparent = Color(0.9, 0.1, 0.1, alpha=0.25)
+    light_red = Color(1, 0.5, 0.5, alpha=0.15)
+
+    # Lingkaran luar dengan gradien simulasi (lapisan)
+    canvas.setStrokeColor(red_transparent)
+    canvas.setFillColor(red_transparent)
+    canvas.setLineWidth(6)
+    canvas.circle(x, y, 130)
+
+    canvas.setStrokeColor(light_red)
+    canvas.setFillColor(light_red)
+    canvas.setLineWidth(4)
+    canvas.circle(x, y, 125)
+
+    # Lingkaran dalam
+    canvas.setStrokeColor(red_transparent)
+    canvas.setFillColor(red_transparent)
+    canvas.setLineWidth(3)
+    canvas.circle(x, y, 95)
+
+    # Garis putus-putus tengah yang lebih halus
+    canvas.setLineWidth(1)
+    canvas.setDash(3, 3)
+    canvas.setStrokeColor(Color(0.8, 0.2, 0.2, alpha=0.4))
+    canvas.circle(x, y, 108)
+    canvas.setDash()
+
+    # Tulisan melengkung atas: ALVIRA HOMESTAY
+    canvas.setFont("Helvetica-Bold", 9)
+    canvas.setFillColor(Color(0.6, 0, 0, alpha=0.7))
+    draw_top_text(canvas, "ALVIRA HOMESTAY", x, y, 115)
+
+    # Tulisan tengah LUNAS dengan font yang lebih elegan dan efek
+    canvas.setFont("Times-Bold", 60)
+    canvas.translate(x, y)
+    canvas.rotate(15)  # Rotasi lebih kecil untuk kesan lebih stabil
+    canvas.setFillColor(Color(0.7, 0, 0, alpha=0.8))  # Warna lebih gelap untuk kontras
+    canvas.drawCentredString(0, -20, "LUNAS")
+    canvas.rotate(-15)
+    canvas.translate(-x, -y)
+
+    # Tanggal pelunasan kecil di tengah bawah dengan posisi yang lebih baik
+    tanggal_lunas = datetime.now().strftime("%d %b %Y")
+    canvas.setFont("Helvetica", 12)
+    canvas.setFillColor(Color(0.5, 0, 0, alpha=0.6))
+    canvas.drawCentredString(x, y - 60, f"Paid on {tanggal_lunas}")
+
+    # Kalimat terima kasih melengkung di bawah
+    canvas.setFont("Helvetica-Bold", 8)
+    canvas.setFillColor(Color(0.6, 0, 0, alpha=0.7))
+    draw_bottom_text(canvas, "Terima Kasih", x, y, 110)
+
+    canvas.restoreState()
+
+# ============================
+# EXPORT FUNCTIONS
+# ============================
+
+def generate_excel(df):
+    """
+    Export Excel yang ditulis baris per baris (xlsxwriter constant_memory).
+
+    Uang ditulis sebagai angka dengan format "Rp" #,##0 (tetap bisa
+    di-sort/jumlah di Excel; pemisah ribuan ikut locale Excel), tanggal
+    sebagai tanggal, dan warna status lewat conditional formatting.
+    """
+    output = BytesIO()
+
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+    worksheet = workbook.add_worksheet("Laporan Booking")
+
+    header_format = workbook.add_format({
+        "bold": True,
+        "border": 1,
+        "align": "center",
+        "valign": "top",
+    })
+    money_format = workbook.add_format({"num_format": '"Rp" #,##0'})
+    date_format = workbook.add_format({"num_format": "dd-mm-yyyy"})
+
+    columns = [str(c) for c in df.columns]
+
+    col_formats = []
+    for col_num, col in enumerate(columns):
+        if col in MONEY_COLUMNS:
+            col_formats.append(money_format)
+            worksheet.set_column(col_num, col_num, 14)
+        elif col in DATE_COLUMNS:
+            col_formats.append(date_format)
+            worksheet.set_column(col_num, col_num, 12)
+        else:
+            col_formats.append(None)
+
+    # constant_memory: baris harus ditulis berurutan, header dulu
+    worksheet.write_row(0, 0, columns, header_format)
+
+    for row_num, row in enumerate(df.itertuples(index=False, name=None), start=1):
+        for col_num, value in enumerate(row):
+            if value is None or pd.isna(value):
+                continue
+            worksheet.write(row_num, col_num, value, col_formats[col_num])
+
+    # Format warna status
+    if "status" in columns and len(df):
+        status_col = columns.index("status")
+
+        for status, warna in STATUS_COLORS.items():
+            worksheet.conditional_format(1, status_col, len(df), status_col, {
+                "type": "cell",
+                "criteria": "==",
+                "value": f'"{status}"',
+                "format": workbook.add_format({"bg_color": warna}),
+            })
+
+    workbook.close()
+
+    return output.getvalue()
+
+def bagian_bulanan(df):
+    """
+    Pecah data laporan jadi bagian per bulan checkin.
+
+    Return [(nama_bulan, group_export), ...] urut bulan; group_export sudah
+    siap ditulis ke tabel (nomor urut, tanggal & rupiah sudah string).
+    """
+    df_pdf = df.copy()
+
+    # 🔥 WAJIB: convert datetime dulu
+    df_pdf["checkin"] = pd.to_datetime(df_pdf["checkin"], errors="coerce")
+    df_pdf["checkout"] = pd.to_datetime(df_pdf["checkout"], errors="coerce")
+
+    # Urutkan berdasarkan checkin
+    df_pdf = df_pdf.sort_values("checkin")
+
+    bagian = []
+
+    # Loop per bulan (periode dihitung SEBELUM format string)
+    for periode, group in df_pdf.groupby(df_pdf["checkin"].dt.to_period("M")):
+
+        nama_bulan = periode.strftime("%B %Y").upper()
+
+        # Reset nomor urut khusus bulan ini
+        group = group.sort_values("checkin").reset_index(drop=True)
+        group.index = group.index + 1
+        group.index.name = "No"
+        group = group.reset_index()
+
+        # Format tanggal ke string SETELAH grouping
+        group["checkin"] = group["checkin"].dt.strftime("%d-%m-%Y")
+        group["checkout"] = group["checkout"].dt.strftime("%d-%m-%Y")
+
+        # Format rupiah
+        for col in MONEY_COLUMNS:
+            if col in group.columns:
+                group[col] = format_rupiah(group[col])
+
+        bagian.append((nama_bulan, group))
+
+    return bagian
+
+def render_bulan(nama_bulan, group_export):
+    """
+    Render 1 bulan laporan booking jadi PDF sendiri.
+
+    Setiap bulan di-layout terpisah supaya bisa dikerjakan paralel dan
+    di-cache per bulan; header laporan ada di sampul (render_sampul).
+    """
+    buffer = BytesIO()
+
+    doc = SimpleDocTemplate(buffer, pagesize=pagesizes.A4)
+
+    t = report_template()
+    elements = []
+
+    elements.append(Paragraph(f"📅 {nama_bulan}", t["styles"]["Heading2"]))
+    elements.append(Spacer(1, 10))
+
+    elements.append(tabel_bulan(group_export))
+    elements.append(Spacer(1, 20))
+
+    elements.append(Spacer(1, 15))
+    elements.append(Paragraph(
+        "*harga dapat berubah sewaktu-waktu",
+        t["disclaimer"]
+    ))
+
+    doc.build(elements, onFirstPage=add_watermark, onLaterPages=add_watermark)
+
+    pdf = buffer.getvalue()
+    buffer.close()
+    return pdf
+
+def rekap_bulanan(df):
+    """
+    Rekap per bulan checkin dari data laporan itu sendiri, untuk sampul
+    kalau rekap monthly_summary tidak diberikan. Index = bulan (tanggal 1).
+    """
+    checkin = pd.to_datetime(df["checkin"], errors="coerce")
+    malam = (pd.to_datetime(df["checkout"], errors="coerce") - checkin).dt.days
+
+    rekap = df.assign(malam=malam).groupby(checkin.dt.to_period("M")).agg(
+        booking=("kamar", "size"),
+        malam=("malam", "sum"),
+        pendapatan=("total", "sum"),
+        dp=("dp", "sum"),
+        sisa=("sisa", "sum"),
+    )
+    rekap.index = rekap.index.to_timestamp().date
+    return rekap
+
+def render_sampul(rekap):
+    """
+    Halaman pertama laporan: header + rekap per bulan (1 baris per bulan).
+
+    rekap : DataFrame index bulan (tanggal 1), kolom booking, malam,
+            pendapatan, dp, sisa (misalnya dari tabel monthly_summary)
+    """
+    buffer = BytesIO()
+
+    doc = SimpleDocTemplate(buffer, pagesize=pagesizes.A4)
+
+    t = report_template()
+    elements = header_laporan("LAPORAN BOOKING")
+
+    if len(rekap):
+        sampul = pd.DataFrame({
+            "Bulan": [pd.Timestamp(b).strftime("%B %Y").upper() for b in rekap.index],
+            "Booking": rekap["booking"].astype(int).to_numpy(),
+            "Malam": rekap["malam"].astype(int).to_numpy(),
+            "Pendapatan": format_rupiah(rekap["pendapatan"]).to_numpy(),
+            "DP": format_rupiah(rekap["dp"]).to_numpy(),
+            "Sisa": format_rupiah(rekap["sisa"]).to_numpy(),
+        })
+
+        elements.append(Paragraph("Rekap per Bulan", t["styles"]["Heading2"]))
+        elements.append(Spacer(1, 10))
+        elements.append(tabel_bulan(sampul))
+
+    doc.build(elements, onFirstPage=add_watermark, onLaterPages=add_watermark)
+
+    pdf = buffer.getvalue()
+    buffer.close()
+    return pdf
+
+def gabung_pdf(parts):
+    """Sambung beberapa PDF (bytes) jadi 1 dokumen, urut sesuai list."""
+    writer = PdfWriter()
+
+    for part in parts:
+        writer.append(BytesIO(part))
+
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+def generate_pdf(df, rekap=None):
+    """Laporan booking lengkap, sampul + semua bulan dirender berurutan di proses ini."""
+    if rekap is None:
+        rekap = rekap_bulanan(df)
+
+    return gabung_pdf([render_sampul(rekap)] + [
+        render_bulan(nama_bulan, group_export)
+        for nama_bulan, group_export in bagian_bulanan(df)
+    ])
+
+def generate_invoice(bookings):
+
+    if not bookings:
+        return None
+
+    first = bookings[0]
+
+    invoice_number = first.get("group_id") or first["id"]
+    nama = first["nama"]
+    hp = first["hp"]
+
+    grand_total = sum(b["total"] for b in bookings)
+    grand_dp = sum(b["dp"] for b in bookings)
+    grand_sisa = grand_total - grand_dp
+
+    buffer = BytesIO()
+
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=pagesizes.A4,
+        rightMargin=30,
+        leftMargin=40,
+        topMargin=40,
+        bottomMargin=40
+    )
+
+    # =========================
+    # HEADER
+    # =========================
+    elements = header_invoice(invoice_number)
+
+    # =========================
+    # BILL TO
+    # =========================
+    bill_to = Table([
+        ["Bill To"],
+        [nama],
+        [hp],
+    ], colWidths=[3*inch])
+
+    bill_to.setStyle(TableStyle([
+        ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
+        ('FONTSIZE', (0,0), (-1,-1), 10),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
+    ]))
+
+    bill_to.hAlign = 'LEFT'
+
+    elements.append(bill_to)
+    elements.append(Spacer(1, 20))
+
+    # =========================
+    # ITEM TABLE
+    # =========================
+        
+    item_data = [["Kamar", "Check-in", "Check-out", "Nights", "Amount"]]
+
+    grand_total = 0
+    grand_dp = 0
+    
+    for b in bookings:
+    
+        checkin = b["checkin"]
+        checkout = b["checkout"]
+    
+        if hasattr(checkin, "date"):
+            checkin = checkin.date()
+        if hasattr(checkout, "date"):
+            checkout = checkout.date()
+    
+        nights = (checkout - checkin).days
+
+        # Total per kamar dari engine harga (tarif musiman & libur ikut);
+        # harga per malam hanya untuk data lama yang belum punya total
+        subtotal = b.get("total")
+        if subtotal is None or pd.isna(subtotal):
+            subtotal = nights * (b.get("harga") or 0)
+    
+        grand_total += subtotal
+        grand_dp += b.get("dp", 0)
+    
+        item_data.append([
+            f"Kamar {b['kamar']}",
+            str(checkin),
+            str(checkout),
+            str(nights),
+            rupiah(subtotal)
+        ])
+    
+    grand_sisa = grand_total - grand_dp
+
+    item_table = Table(item_data, colWidths=[1.2*inch, 1.2*inch, 1.2*inch, 0.8*inch, 1.2*inch])
+
+    item_table.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#F2F3F4")),
+        ('GRID', (0,0), (-1,-1), 0.5, colors.HexColor("#D5D8DC")),
+        ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
+        ('FONTSIZE', (0,0), (-1,-1), 9),
+        ('ALIGN', (1,1), (-1,-1), 'CENTER'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+    ]))
+
+    elements.append(item_table)
+    elements.append(Spacer(1, 30))
+
+    # =========================
+    # TOTAL SECTION
+    # =========================
+    total_table = Table([
+        ["TOTAL", rupiah(grand_total)],
+        ["DP", rupiah(grand_dp)],
+        ["SISA", rupiah(grand_sisa)],
+    ], colWidths=[4.6*inch, 1.2*inch])
+
+    total_table.setStyle(TableStyle([
+        # garis atas
+        ('LINEABOVE', (0,0), (-1,-1), 1.5, colors.black),
+    
+        # font
+        ('FONTNAME', (0,0), (-1,-1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,-1), 11),
+    
+        # 🔥 ALIGN KANAN SEMUA HARGA (kolom ke-1 index 1)
+        ('ALIGN', (1,0), (1,-1), 'RIGHT'),
+    
+        # padding biar rata kanan sempurna
+        ('RIGHTPADDING', (1,0), (1,-1), 0),
+        ('LEFTPADDING', (1,0), (1,-1), 0),
+    
+        # spacing atas bawah
+        ('TOPPADDING', (0,0), (-1,-1), 8),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 8),
+    ]))
+
+    elements.append(total_table)
+    elements.append(Spacer(1, 60))
+
+    # Kondisi pembangunan dokumen tetap sama
+    # 🔥 PENTING: build di luar function
+    if grand_sisa <= 0:
+        doc.build(elements, onFirstPage=add_lunas_watermark)
+    else:
+        doc.build(elements)
+        
+    buffer.seek(0)
+    pdf = buffer.getvalue()
+    buffer.close()
+        
+    if not pdf:
+        return None
+        
+    return pdf
+
+def generate_pdf_public(df):
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=pagesizes.A4)
+
+    t = report_template()
+    elements = header_laporan("LAPORAN BOOKING")
+
+    df_pdf = df.copy()
+
+    # Convert ke datetime dulu
+    df_pdf["checkin"] = pd.to_datetime(df_pdf["checkin"], errors="coerce")
+    df_pdf["checkout"] = pd.to_datetime(df_pdf["checkout"], errors="coerce")
+
+    # Urutkan berdasarkan checkin
+    df_pdf = df_pdf.sort_values("checkin")
+
+    # Buat kolom bulan
+    df_pdf["bulan"] = df_pdf["checkin"].dt.to_period("M")
+
+    # Loop per bulan
+    for periode, group in df_pdf.groupby("bulan"):
+
+        nama_bulan = periode.strftime("%B %Y").upper()
+        elements.append(Paragraph(f"📅 {nama_bulan}", t["styles"]["Heading2"]))
+        elements.append(Spacer(1, 10))
+
+        group = group.sort_values("checkin").reset_index(drop=True)
+
+        # Nomor urut per bulan
+        group.index = group.index + 1
+        group.index.name = "No"
+        group = group.reset_index()
+
+        # Format tanggal
+        group["checkin"] = group["checkin"].dt.strftime("%d-%m-%Y")
+        group["checkout"] = group["checkout"].dt.strftime("%d-%m-%Y")
+
+        # ❌ HIDE KOLOM HARGA UNTUK PUBLIC
+        for col in ["harga", "total", "dp", "sisa", "id","hp"]:
+            if col in group.columns:
+                group = group.drop(columns=[col])
+
+        group_export = group.drop(columns=["bulan"])
+
+        elements.append(tabel_bulan(group_export))
+        elements.append(Spacer(1, 20))
+
+    doc.build(elements, onFirstPage=add_watermark, onLaterPages=add_watermark)
+
+    pdf = buffer.getvalue()
+    buffer.close()
+    return pdf
+
+# ============================
+# RENDER DI WORKER PROCESS
+# ============================
+
+def mp_context():
+    """
+    forkserver: worker di-fork dari proses server yang bersih, bukan dari
+    proses Streamlit yang multi-thread, dan tidak menjalankan ulang app.py.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+def warm_worker():
+    """Initializer worker: daftarkan font & decode logo sekali di awal."""
+    report_template()
+
+# ============================
+# INVOICE MASSAL
+# ============================
+
+def invoice_groups(df):
+    """{group_id: [booking, ...]}; booking tanpa group_id jadi grup sendiri (pakai id)."""
+    keys = df["group_id"].fillna(df["id"]).astype(str)
+
+    return {
+        group_id: group.to_dict("records")
+        for group_id, group in df.groupby(keys, sort=False)
+    }
+
+def chunk_groups(groups, n):
+    """Bagi {group_id: bookings} jadi maksimal n potongan [(group_id, bookings), ...]."""
+    items = list(groups.items())
+    n = max(1, min(n, len(items)))
+    return [items[i::n] for i in range(n)]
+
+def render_invoices(chunk):
+    """Render 1 potongan invoice. Return [(group_id, pdf, detik), ...]."""
+    hasil = []
+
+    for group_id, bookings in chunk:
+        start = time.perf_counter()
+        pdf = generate_invoice(bookings)
+        hasil.append((group_id, pdf, time.perf_counter() - start))
+
+    return hasil
+
+def zip_invoices(hasil):
+    """
+    Gabungkan hasil render_invoices jadi 1 file ZIP.
+
+    Return (zip bytes, [{"group_id", "detik", "ukuran_kb"}, ...]).
+    """
+    buffer = BytesIO()
+    timings = []
+
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for group_id, pdf, detik in hasil:
+            if pdf:
+                zf.writestr(f"invoice_{group_id}.pdf", pdf)
+
+            timings.append({
+                "group_id": group_id,
+                "detik": round(detik, 3),
+                "ukuran_kb": round(len(pdf or b"") / 1024, 1),
+            })
+
+    return buffer.getvalue(), timings
@@ -0,0 +1,780 @@
+"""
+Akses database: connection pool, migrasi schema, booking, tarif & KPI.
+
+Tidak bergantung pada Streamlit. Semua query menerima koneksi psycopg2
+(lihat connection()), kecuali fungsi pool itu sendiri.
+"""
+
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pandas as pd
+import psycopg2
+from psycopg2 import errors as pg_errors
+from psycopg2 import pool as pg_pool
+from psycopg2.extras import execute_values
+
+from .availability import okupansi_baru, okupansi_hapus, okupansi_tambah
+from .pricing import harga_rata_malam, hitung_harga
+from .status import REFRESH_STATUS_SQL, get_status
+
+# ============================
+# CONNECTION POOL
+# ============================
+
+POOL_MIN_CONN = 1
+POOL_MAX_CONN = 8
+
+# Koneksi yang idle lebih lama dari ini di-ping dulu sebelum dipakai,
+# supaya koneksi yang sudah diputus server tidak sampai ke query.
+POOL_IDLE_PING = 60  # detik
+
+def create_pool(dsn, max_conn=POOL_MAX_CONN):
+    """
+    Pool koneksi + semaphore & metrics, dipakai bersama semua thread.
+
+    Semaphore membatasi checkout ke max_conn, jadi thread yang
+    kebagian antre menunggu (dan tercatat di metrics) alih-alih
+    kena PoolError.
+    """
+    return {
+        "pool": pg_pool.ThreadedConnectionPool(
+            POOL_MIN_CONN,
+            max_conn,
+            dsn,
+            sslmode="require",
+            keepalives=1,
+            keepalives_idle=30,
+        ),
+        "max_conn": max_conn,
+        "slots": threading.BoundedSemaphore(max_conn),
+        "lock": threading.Lock(),
+        "last_used": {},
+        "metrics": {
+            "checkouts": 0,
+            "in_use": 0,
+            "waits": 0,
+            "reconnects": 0,
+            "checkout_ms_total": 0.0,
+            "checkout_ms_max": 0.0,
+        },
+    }
+
+def _is_alive(conn):
+    if conn.closed:
+        return False
+
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+def _checkout(db):
+    conn = db["pool"].getconn()
+    last_used = db["last_used"].get(id(conn))
+
+    # Koneksi baru tidak perlu di-ping, yang lama di-ping kalau sudah lama idle
+    if conn.closed or (
+        last_used is not None
+        and time.monotonic() - last_used > POOL_IDLE_PING
+        and not _is_alive(conn)
+    ):
+        db["pool"].putconn(conn, close=True)
+        with db["lock"]:
+            db["metrics"]["reconnects"] += 1
+        conn = db["pool"].getconn()
+
+    return conn
+
+@contextmanager
+def connection(db):
+    """
+    Pinjam 1 koneksi dari pool untuk 1 unit kerja.
+
+    Commit kalau blok selesai normal, rollback kalau error. Koneksi yang
+    putus (OperationalError/InterfaceError) dibuang dari pool, jadi
+    request berikutnya otomatis dapat koneksi baru.
+    """
+    metrics = db["metrics"]
+
+    start = time.perf_counter()
+
+    if not db["slots"].acquire(blocking=False):
+        with db["lock"]:
+            metrics["waits"] += 1
+        db["slots"].acquire()
+
+    try:
+        conn = _checkout(db)
+    except Exception:
+        db["slots"].release()
+        raise
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    with db["lock"]:
+        metrics["checkouts"] += 1
+        metrics["in_use"] += 1
+        metrics["checkout_ms_total"] += elapsed_ms
+        metrics["checkout_ms_max"] = max(metrics["checkout_ms_max"], elapsed_ms)
+
+    done = False
+    broken = False
+
+    try:
+        yield conn
+        conn.commit()
+        done = True
+
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+
+    finally:
+        # Termasuk st.stop()/st.rerun() di tengah blok: jangan sampai
+        # transaksi setengah jadi balik ke pool
+        if not done and not broken:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+
+        close = broken or bool(conn.closed)
+        db["last_used"].pop(id(conn), None)
+
+        if not close:
+            db["last_used"][id(conn)] = time.monotonic()
+
+        db["pool"].putconn(conn, close=close)
+
+        with db["lock"]:
+            metrics["in_use"] -= 1
+            if close:
+                metrics["reconnects"] += 1
+
+        db["slots"].release()
+
+def pool_metrics(db):
+    with db["lock"]:
+        m = dict(db["metrics"])
+
+    m["checkout_ms_avg"] = (
+        m["checkout_ms_total"] / m["checkouts"] if m["checkouts"] else 0.0
+    )
+    m["max_conn"] = db["max_conn"]
+    return m
+
+# ============================
+# MIGRASI SCHEMA
+# ============================
+
+MIGRATIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations"
+)
+
+# Kunci advisory supaya 2 proses yang start bersamaan tidak
+# menjalankan migrasi yang sama 2x
+MIGRATION_LOCK_ID = 20240601
+
+def load_migrations():
+    """Baca migrations/NNN_nama.sql, urut berdasarkan nomor versi."""
+    migrations = []
+
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        if not filename.endswith(".sql"):
+            continue
+
+        version, name = filename[:-4].split("_", 1)
+
+        with open(os.path.join(MIGRATIONS_DIR, filename), encoding="utf-8") as f:
+            migrations.append((int(version), name, f.read()))
+
+    return sorted(migrations)
+
+def apply_migrations(conn):
+    """
+    Terapkan migrasi yang belum tercatat di schema_migrations, dalam
+    transaksi koneksi ini. Return daftar versi yang baru diterapkan.
+    """
+    applied_now = []
+
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        """)
+
+        cursor.execute("SELECT version FROM schema_migrations")
+        applied = {row[0] for row in cursor.fetchall()}
+
+        for version, name, sql in load_migrations():
+            if version in applied:
+                continue
+
+            cursor.execute(sql)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (version, name)
+            )
+            applied_now.append(version)
+
+    return applied_now
+
+# ============================
+# STATUS & BENTROK
+# ============================
+
+def refresh_status(conn, today):
+    """Sinkronkan kolom status dengan tanggal hari ini. Return jumlah baris yang berubah."""
+    with conn.cursor() as cursor:
+        cursor.execute(REFRESH_STATUS_SQL, {"today": today})
+        return cursor.rowcount
+
+def find_conflicts(conn, kamar_list, checkin, checkout, booking_id=None):
+    """
+    Cek semua kamar sekaligus dalam 1 query.
+
+    Pakai index GiST (parsial, checkout > checkin) dari constraint
+    bookings_kamar_no_overlap. Return list kamar yang bentrok (kosong kalau semua tersedia).
+    """
+    if not kamar_list:
+        return []
+
+    query = """
+        SELECT DISTINCT kamar
+        FROM bookings
+        WHERE kamar = ANY(%s)
+        AND (%s::integer IS NULL OR id <> %s::integer)
+        AND checkout > checkin
+        AND daterange(checkin, checkout) && daterange(%s::date, %s::date)
+        ORDER BY kamar
+    """
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            query,
+            (
+                list(kamar_list),
+                booking_id, booking_id,
+                checkin, checkout
+            )
+        )
+
+        return [row[0] for row in cursor.fetchall()]
+
+# ============================
+# TULIS BOOKING
+# ============================
+
+class BookingConflict(Exception):
+    """Kamar sudah terisi di rentang tanggal yang diminta."""
+
+    def __init__(self, kamar):
+        self.kamar = list(kamar)
+        super().__init__(f"{', '.join(self.kamar)} sudah dibooking di tanggal tersebut")
+
+def simpan_booking(conn, kal, nama, hp, kamar_list, checkin, checkout, dp):
+    """
+    Simpan booking multi-kamar dengan 1 group_id secara atomik.
+
+    Semua baris masuk lewat 1 INSERT ... VALUES (...), (...) dalam
+    1 transaksi. Bentrok ditolak oleh constraint bookings_kamar_no_overlap,
+    jadi 2 staf yang booking kamar sama bersamaan tidak bisa lolos dua-duanya,
+    dan tidak ada group yang tersimpan setengah.
+
+    Return (group_id, [id baru]), atau raise BookingConflict berisi kamar
+    yang bentrok.
+    """
+    # 🔥 Buat 1 GROUP ID untuk semua kamar
+    group_id = str(uuid.uuid4())[:8]
+
+    total_per_kamar = dict(zip(
+        kamar_list,
+        hitung_harga(kal, kamar_list, checkin, checkout).tolist()
+    ))
+    total_semua = sum(total_per_kamar.values())
+
+    # 💎 Split DP rata per kamar
+    dp_per_kamar = dp / len(kamar_list)
+    status_group = get_status(checkin, checkout, total_semua - dp)
+
+    rows = [
+        (
+            nama,
+            hp,
+            k,
+            checkin,
+            checkout,
+            harga_rata_malam(total_per_kamar[k], checkin, checkout),
+            total_per_kamar[k],
+            dp_per_kamar,
+            total_per_kamar[k] - dp_per_kamar,
+            status_group,
+            group_id
+        )
+        for k in kamar_list
+    ]
+
+    try:
+        with conn.cursor() as cursor:
+            ids = execute_values(cursor, """
+                INSERT INTO bookings
+                (nama, hp, kamar, checkin, checkout, harga,
+                 total, dp, sisa, status, group_id)
+                VALUES %s
+                RETURNING id
+            """, rows, fetch=True)
+
+    except pg_errors.ExclusionViolation:
+        # Buang transaksi yang gagal dulu, baru cari kamar mana saja yang bentrok
+        conn.rollback()
+        raise BookingConflict(
+            find_conflicts(conn, kamar_list, checkin, checkout) or kamar_list
+        )
+
+    return group_id, [row[0] for row in ids]
+
+def update_booking(conn, booking_id, nama, hp, kamar, checkin, checkout,
+                   harga, total, dp, sisa, status):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            UPDATE bookings
+            SET nama=%s, hp=%s, kamar=%s,
+                checkin=%s, checkout=%s,
+                harga=%s, total=%s,
+                dp=%s, sisa=%s, status=%s
+            WHERE id=%s
+        """, (
+            nama, hp, kamar,
+            checkin, checkout,
+            harga, total,
+            dp, sisa,
+            status,
+            booking_id
+        ))
+
+def delete_booking(conn, booking_id):
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM bookings WHERE id=%s", (booking_id,))
+
+def reset_bookings(conn):
+    """Hapus semua booking & rekap, lalu mulai id dari 1 lagi."""
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM bookings;")
+        cursor.execute("DELETE FROM monthly_summary;")
+        cursor.execute("ALTER SEQUENCE bookings_id_seq RESTART WITH 1;")
+
+# ============================
+# SNAPSHOT BOOKING (SYNC INCREMENTAL)
+# ============================
+
+BOOKING_COLUMNS = """
+    id,
+    nama,
+    hp,
+    kamar,
+    checkin,
+    checkout,
+    harga,
+    total,
+    dp,
+    sisa,
+    status,
+    group_id
+"""
+
+# Jendela operasional: booking dengan checkin sejak tanggal 1,
+# JENDELA_BULAN bulan lalu (plus semua yang akan datang).
+# Yang lebih lama hanya dibaca lewat arsip.
+JENDELA_BULAN = 3
+
+# updated_at diisi sebelum commit, jadi transaksi yang commit agak
+# terlambat bisa punya timestamp sedikit di belakang titik sync.
+# Setiap sync mengambil ulang perubahan di jendela ini (merge-nya idempotent).
+SYNC_OVERLAP = timedelta(seconds=30)
+
+# bookings_deleted hanya perlu menyimpan jejak sebatas ini (lihat
+# prune_bookings_deleted). Snapshot yang sync terakhirnya lebih lama
+# dari ini di-load ulang penuh, karena jejaknya mungkin sudah dibuang.
+LOG_HAPUS_RETENSI = timedelta(days=1)
+
+def prune_bookings_deleted(conn, retensi=LOG_HAPUS_RETENSI):
+    """Buang jejak hapus yang lebih tua dari retensi. Return jumlah baris yang dibuang."""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "DELETE FROM bookings_deleted WHERE deleted_at < clock_timestamp() - %s",
+            (retensi,)
+        )
+        return cursor.rowcount
+
+def jendela_mulai(today=None):
+    today = today or date.today()
+    bulan = today.year * 12 + today.month - 1 - JENDELA_BULAN
+    return date(bulan // 12, bulan % 12 + 1, 1)
+
+def new_snapshot(mulai):
+    """
+    Snapshot booking di jendela operasional (checkin >= mulai).
+
+    df      : data terakhir, index = id
+    since   : waktu DB saat sync terakhir
+    dirty   : id yang baru ditulis aplikasi, wajib diambil ulang
+    okupansi: bitmap kamar × tanggal dari df (lihat availability.okupansi_baru)
+    """
+    return {
+        "mulai": mulai,
+        "df": None,
+        "okupansi": None,
+        "since": None,
+        "dirty": set(),
+        "lock": threading.Lock(),
+    }
+
+def clear_snapshot(snap):
+    with snap["lock"]:
+        snap["df"] = None
+        snap["okupansi"] = None
+        snap["since"] = None
+        snap["dirty"].clear()
+
+def sync_snapshot(conn, snap):
+    """
+    Bawa snapshot ke kondisi database terbaru. Pemanggil memegang snap["lock"].
+
+    Load penuh hanya kalau snapshot masih kosong (atau sync terakhirnya
+    lebih lama dari LOG_HAPUS_RETENSI); selain itu cuma baris
+    yang berubah (updated_at), dihapus (bookings_deleted) atau ditandai
+    dirty yang diambil.
+    """
+    with conn.cursor() as cursor:
+        if snap["df"] is None:
+            cursor.execute("SELECT clock_timestamp()")
+            now = cursor.fetchone()[0]
+
+            df = pd.read_sql_query(
+                f"SELECT {BOOKING_COLUMNS} FROM bookings WHERE checkin >= %s",
+                conn,
+                params=(snap["mulai"],)
+            )
+            isi_snapshot(snap, df, now)
+            return
+
+        since = snap["since"] - SYNC_OVERLAP
+
+        cursor.execute("""
+            SELECT
+                clock_timestamp(),
+                ARRAY(
+                    SELECT id FROM bookings_deleted
+                    WHERE deleted_at > %s
+                )
+        """, (since,))
+        now, deleted = cursor.fetchone()
+
+        if now - snap["since"] > LOG_HAPUS_RETENSI - SYNC_OVERLAP:
+            snap["df"] = None
+            return sync_snapshot(conn, snap)
+
+        dirty = list(snap["dirty"])
+
+        changed = pd.read_sql_query(f"""
+            SELECT {BOOKING_COLUMNS}
+            FROM bookings
+            WHERE updated_at > %s
+            OR id = ANY(%s)
+        """, conn, params=(since, dirty))
+
+    merge_snapshot(snap, changed, deleted, dirty, now)
+
+def isi_snapshot(snap, df, now):
+    """Isi snapshot dari hasil load penuh."""
+    snap["df"] = df.set_index("id", drop=False)
+    snap["okupansi"] = okupansi_baru(snap["mulai"], df)
+    snap["since"] = now
+    snap["dirty"].clear()
+
+def merge_snapshot(snap, changed, deleted, dirty, now):
+    """
+    Gabungkan hasil 1 sync incremental ke snapshot.
+
+    changed : baris yang berubah sejak sync terakhir (+ yang dirty)
+    deleted : id dari bookings_deleted
+    dirty   : id dirty yang ikut diambil di sync ini
+    """
+    df = snap["df"]
+
+    # Baris yang diedit keluar dari jendela ikut dibuang
+    keluar = pd.to_datetime(changed["checkin"]) < pd.Timestamp(snap["mulai"])
+    gone_ids = set(changed.loc[keluar, "id"])
+    changed = changed[~keluar]
+
+    # Hapus dulu, baru upsert: id yang dihapus lalu dipakai lagi
+    # (setelah reset sequence) tetap muncul dengan data terbarunya
+    gone = set(deleted) | gone_ids | (set(dirty) - gone_ids - set(changed["id"]))
+    if gone:
+        df = df.drop(index=list(gone), errors="ignore")
+
+    okupansi_hapus(snap["okupansi"], gone | set(changed["id"]))
+    okupansi_tambah(snap["okupansi"], changed)
+
+    if not changed.empty:
+        changed = changed.set_index("id", drop=False)
+        df = pd.concat([df.drop(index=changed.index, errors="ignore"), changed])
+
+    snap["df"] = df
+    snap["since"] = now
+    snap["dirty"].difference_update(dirty)
+
+# ============================
+# QUERY BOOKING (FILTER DI SQL)
+# ============================
+
+def query_bookings(conn, mulai=None, sampai=None, status=None, after=None, limit=None):
+    """
+    Ambil booking dengan filter yang dijalankan di database.
+
+    mulai, sampai : rentang tanggal checkin [mulai, sampai)
+    status        : list status yang ditampilkan
+    after         : (checkin, id) baris terakhir halaman sebelumnya
+                    (keyset pagination, urut checkin lalu id)
+    limit         : jumlah baris maksimal
+    """
+    where = []
+    params = []
+
+    if mulai is not None:
+        where.append("checkin >= %s")
+        params.append(mulai)
+
+    if sampai is not None:
+        where.append("checkin < %s")
+        params.append(sampai)
+
+    if status:
+        where.append("status = ANY(%s)")
+        params.append(list(status))
+
+    if after is not None:
+        where.append("(checkin, id) > (%s, %s)")
+        params.extend(after)
+
+    query = f"SELECT {BOOKING_COLUMNS} FROM bookings"
+
+    if where:
+        query += " WHERE " + " AND ".join(where)
+
+    query += " ORDER BY checkin, id"
+
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+
+    return pd.read_sql_query(query, conn, params=params)
+
+def bulan_arsip(conn, sebelum):
+    """Daftar bulan (tanggal 1) yang punya booking sebelum tanggal sebelum."""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT DISTINCT date_trunc('month', checkin)::date
+            FROM bookings
+            WHERE checkin < %s
+            ORDER BY 1 DESC
+        """, (sebelum,))
+        return [row[0] for row in cursor.fetchall()]
+
+def query_open_groups(conn):
+    """Semua booking dari grup yang masih punya sisa pembayaran."""
+    return pd.read_sql_query(f"""
+        SELECT {BOOKING_COLUMNS}
+        FROM bookings
+        WHERE COALESCE(group_id, id::text) IN (
+            SELECT COALESCE(group_id, id::text)
+            FROM bookings
+            GROUP BY 1
+            HAVING SUM(sisa) > 0
+        )
+        ORDER BY checkin, id
+    """, conn)
+
+def query_groups(conn, group_ids):
+    """
+    Semua booking dari group_id yang diminta, untuk invoice massal.
+
+    Booking lama tanpa group_id bisa dipanggil dengan id-nya (seperti
+    kunci di reports.invoice_groups).
+    """
+    if not group_ids:
+        return pd.DataFrame(columns=[c.strip() for c in BOOKING_COLUMNS.split(",")])
+
+    return pd.read_sql_query(f"""
+        SELECT {BOOKING_COLUMNS}
+        FROM bookings
+        WHERE COALESCE(group_id, id::text) = ANY(%s)
+        ORDER BY checkin, id
+    """, conn, params=(list(map(str, group_ids)),))
+
+def tahun_booking(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT DISTINCT extract(year FROM checkin)::int
+            FROM bookings
+            ORDER BY 1 DESC
+        """)
+        return [row[0] for row in cursor.fetchall()]
+
+# ============================
+# KPI (AGREGASI DI SQL)
+# ============================
+
+# 1 baris per kamar × bulan, dibaca dari rekap monthly_summary (dijaga
+# trigger, lihat migrations/009), jadi biayanya sebanding jumlah bulan,
+# bukan jumlah booking. Uang (booking, pendapatan, dp, sisa) per bulan
+# checkin; malam terjual & pendapatan per malam per bulan malamnya,
+# supaya okupansi, ADR & RevPAR benar untuk booking lintas bulan.
+KPI_SQL = """
+    WITH kamar AS (
+        SELECT nama_kamar AS kamar FROM rooms WHERE aktif = 1
+    ),
+    bulan AS (
+        SELECT generate_series(
+            %(dari)s::date, %(sampai)s::date - 1, interval '1 month'
+        )::date AS bulan
+    )
+    SELECT
+        k.kamar,
+        bl.bulan,
+        COALESCE(s.booking, 0) AS booking,
+        COALESCE(s.pendapatan, 0) AS pendapatan,
+        COALESCE(s.dp, 0) AS dp,
+        COALESCE(s.sisa, 0) AS sisa,
+        COALESCE(s.malam_terjual, 0) AS malam_terjual,
+        (bl.bulan + interval '1 month')::date - bl.bulan AS malam_tersedia,
+        COALESCE(s.pendapatan_malam, 0) AS pendapatan_malam
+    FROM kamar k
+    CROSS JOIN bulan bl
+    LEFT JOIN monthly_summary s ON s.kamar = k.kamar AND s.bulan = bl.bulan
+    ORDER BY bl.bulan, k.kamar
+"""
+
+def load_kpi(conn, dari, sampai):
+    """KPI per kamar × bulan untuk bulan [dari, sampai); dari & sampai tanggal 1."""
+    kpi = pd.read_sql_query(KPI_SQL, conn, params={"dari": dari, "sampai": sampai})
+
+    for col in ["pendapatan", "dp", "sisa", "pendapatan_malam"]:
+        kpi[col] = kpi[col].astype(float)
+
+    return kpi
+
+def ringkasan_kpi(kpi):
+    """Jumlahkan baris KPI (kamar × bulan) jadi 1 set angka dashboard."""
+    terjual = kpi["malam_terjual"].sum()
+    tersedia = kpi["malam_tersedia"].sum()
+    pendapatan_malam = kpi["pendapatan_malam"].sum()
+
+    return {
+        "booking": int(kpi["booking"].sum()),
+        "pendapatan": kpi["pendapatan"].sum(),
+        "dp": kpi["dp"].sum(),
+        "sisa": kpi["sisa"].sum(),
+        "okupansi": terjual / tersedia if tersedia else 0.0,
+        "adr": pendapatan_malam / terjual if terjual else 0.0,
+        "revpar": pendapatan_malam / tersedia if tersedia else 0.0,
+    }
+
+def rekap_bulan(conn, dari):
+    """Rekap semua kamar per bulan sejak dari, index = bulan (tanggal 1)."""
+    rekap = pd.read_sql_query("""
+        SELECT
+            bulan,
+            SUM(booking)::int AS booking,
+            SUM(malam_terjual)::int AS malam,
+            SUM(pendapatan)::float AS pendapatan,
+            SUM(dp)::float AS dp,
+            SUM(sisa)::float AS sisa
+        FROM monthly_summary
+        WHERE bulan >= %s
+        GROUP BY bulan
+        HAVING SUM(booking) > 0
+        ORDER BY bulan
+    """, conn, params=(dari,))
+
+    return rekap.set_index("bulan")
+
+# ============================
+# TARIF
+# ============================
+
+def tarif_versi(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT versi FROM tarif_versi WHERE id = 1")
+        row = cursor.fetchone()
+
+    return row[0] if row else 0
+
+def load_tarif(conn):
+    """(rooms, musiman, libur) untuk pricing.build_price_calendar."""
+    rooms = pd.read_sql_query("""
+        SELECT nama_kamar, harga, harga_weekend
+        FROM rooms
+        WHERE aktif = 1
+        ORDER BY nama_kamar
+    """, conn)
+
+    musiman = pd.read_sql_query("""
+        SELECT id, kamar, mulai, selesai, harga_weekday, harga_weekend, keterangan
+        FROM tarif_musiman
+        ORDER BY id
+    """, conn)
+
+    libur = pd.read_sql_query("""
+        SELECT tanggal, nama, tambahan
+        FROM hari_libur
+        ORDER BY tanggal
+    """, conn)
+
+    return rooms, musiman, libur
+
+def simpan_tarif_dasar(conn, kamar, harga_weekday, harga_weekend):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "UPDATE rooms SET harga=%s, harga_weekend=%s WHERE nama_kamar=%s",
+            (harga_weekday, harga_weekend, kamar)
+        )
+
+def tambah_tarif_musiman(conn, kamar, mulai, selesai, harga_weekday, harga_weekend, keterangan):
+    """kamar None = berlaku untuk semua kamar."""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO tarif_musiman
+            (kamar, mulai, selesai, harga_weekday, harga_weekend, keterangan)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (kamar, mulai, selesai, harga_weekday, harga_weekend, keterangan))
+
+def hapus_tarif_musiman(conn, tarif_id):
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM tarif_musiman WHERE id=%s", (tarif_id,))
+
+def simpan_hari_libur(conn, tanggal, nama, tambahan):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO hari_libur (tanggal, nama, tambahan)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (tanggal) DO UPDATE
+            SET nama = EXCLUDED.nama, tambahan = EXCLUDED.tambahan
+        """, (tanggal, nama, tambahan))
+
+def hapus_hari_libur(conn, tanggal):
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM hari_libur WHERE tanggal=%s", (tanggal,))
@@ -0,0 +1,54 @@
+"""
+Status booking berdasarkan tanggal & sisa pembayaran.
+"""
+
+from datetime import date
+
+def get_status(checkin, checkout, sisa, today=None):
+    today = today or date.today()
+
+    # 1️⃣ PRIORITAS UTAMA → Kalau sudah lewat tanggal
+    if today > checkout:
+        return "Selesai"
+
+    # 2️⃣ Kalau hari ini checkout
+    if today == checkout:
+        return "Check-out"
+
+    # 3️⃣ Kalau sedang menginap
+    if checkin <= today < checkout:
+        return "Check-in"
+
+    # 4️⃣ Kalau belum masuk tanggal
+    if today < checkin:
+        if sisa <= 0:
+            return "Lunas"
+        return "Booked"
+
+    return "Booked"
+
+# Logika sama persis dengan get_status(), tapi dihitung Postgres untuk
+# semua baris sekaligus. Hanya baris yang statusnya berubah yang di-UPDATE.
+# Baris lama dengan checkout <= checkin dilewati: UPDATE apa pun pada baris
+# itu ditolak constraint bookings_checkout_after_checkin (migrasi 005) dan
+# akan menggagalkan seluruh statement. Statusnya ikut diperbarui lagi
+# setelah tanggalnya dibetulkan lewat form edit.
+REFRESH_STATUS_SQL = """
+    UPDATE bookings b
+    SET status = s.status_baru
+    FROM (
+        SELECT
+            id,
+            CASE
+                WHEN %(today)s::date > checkout::date THEN 'Selesai'
+                WHEN %(today)s::date = checkout::date THEN 'Check-out'
+                WHEN checkin::date <= %(today)s::date THEN 'Check-in'
+                WHEN COALESCE(sisa, 0) <= 0 THEN 'Lunas'
+                ELSE 'Booked'
+            END AS status_baru
+        FROM bookings
+        WHERE (checkout > checkin) IS NOT FALSE
+    ) s
+    WHERE b.id = s.id
+    AND b.status IS DISTINCT FROM s.status_baru
+"""
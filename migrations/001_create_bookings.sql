@@ -0,0 +1,13 @@
+CREATE TABLE IF NOT EXISTS bookings (
+    id SERIAL PRIMARY KEY,
+    nama TEXT,
+    hp TEXT,
+    kamar TEXT,
+    checkin DATE,
+    checkout DATE,
+    harga INTEGER,
+    total INTEGER,
+    dp INTEGER DEFAULT 0,
+    sisa INTEGER DEFAULT 0,
+    status TEXT
+);
@@ -0,0 +1,6 @@
+CREATE TABLE IF NOT EXISTS rooms (
+    id SERIAL PRIMARY KEY,
+    nama_kamar TEXT UNIQUE,
+    harga INTEGER,
+    aktif INTEGER DEFAULT 1
+);
@@ -0,0 +1,2 @@
+-- group_id dipakai insert multi-kamar & invoice, tapi belum ada di DDL awal
+ALTER TABLE bookings ADD COLUMN IF NOT EXISTS group_id TEXT;
@@ -0,0 +1,11 @@
+-- Cek bentrok: WHERE kamar = ... AND checkin < ... AND checkout > ...
+CREATE INDEX IF NOT EXISTS idx_bookings_kamar_checkin
+    ON bookings (kamar, checkin, checkout);
+
+-- Urutan tabel utama & laporan per bulan
+CREATE INDEX IF NOT EXISTS idx_bookings_checkin
+    ON bookings (checkin);
+
+-- Invoice per group
+CREATE INDEX IF NOT EXISTS idx_bookings_group_id
+    ON bookings (group_id);
@@ -0,0 +1,54 @@
+-- btree_gist dibutuhkan supaya kolom TEXT (kamar) bisa ikut di index GiST
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+-- Data lama dari alur cek-lalu-insert bisa sudah berisi booking bentrok.
+-- Cek dulu & gagalkan migrasi dengan daftar id-nya (transaksi di-rollback,
+-- jadi migrasi dicoba lagi setelah datanya dibereskan), daripada
+-- ADD CONSTRAINT gagal dengan pesan yang tidak jelas.
+DO $$
+DECLARE
+    bentrok TEXT;
+BEGIN
+    SELECT string_agg(
+        format('#%s & #%s (%s)', a.id, b.id, a.kamar), ', '
+        ORDER BY a.id, b.id
+    )
+    INTO bentrok
+    FROM bookings a
+    JOIN bookings b
+        ON a.kamar = b.kamar
+        AND a.id < b.id
+        AND a.checkin < b.checkout
+        AND b.checkin < a.checkout
+    WHERE a.checkout > a.checkin
+    AND b.checkout > b.checkin;
+
+    IF bentrok IS NOT NULL THEN
+        RAISE EXCEPTION 'Migrasi 005 dibatalkan: ada booking bentrok di kamar yang sama: %', bentrok
+            USING HINT = 'Ubah tanggal/kamar atau hapus salah satu booking di tiap pasangan, lalu buka ulang aplikasi.';
+    END IF;
+END $$;
+
+-- Database sendiri yang menolak booking bentrok di kamar yang sama.
+-- daterange default [checkin, checkout), jadi checkout di hari yang sama
+-- dengan checkin tamu berikutnya tetap boleh.
+-- Baris lama dengan checkout <= checkin (daterange menolak checkout < checkin)
+-- tidak menempati malam mana pun, jadi tidak ikut constraint.
+-- Constraint ini otomatis membuat index GiST (kamar, daterange) yang
+-- juga dipakai query cek bentrok.
+ALTER TABLE bookings
+    ADD CONSTRAINT bookings_kamar_no_overlap
+    EXCLUDE USING gist (
+        kamar WITH =,
+        daterange(checkin, checkout) WITH &&
+    )
+    WHERE (checkout > checkin);
+
+-- Booking baru wajib checkout setelah checkin; NOT VALID supaya baris
+-- lama yang salah tidak menggagalkan migrasi
+ALTER TABLE bookings
+    ADD CONSTRAINT bookings_checkout_after_checkin
+    CHECK (checkout > checkin) NOT VALID;
+
+-- Sudah digantikan index GiST di atas
+DROP INDEX IF EXISTS idx_bookings_kamar_checkin;
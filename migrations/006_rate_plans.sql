@@ -0,0 +1,62 @@
+-- Tarif dasar per kamar: rooms.harga = weekday, rooms.harga_weekend = weekend
+ALTER TABLE rooms ADD COLUMN IF NOT EXISTS harga_weekend INTEGER;
+
+INSERT INTO rooms (nama_kamar, harga, harga_weekend) VALUES
+    ('Alvira 1', 350000, 400000),
+    ('Alvira 2', 300000, 350000),
+    ('Alvira 3', 190000, 225000),
+    ('Alvira 4', 300000, 350000),
+    ('Alvira 5', 450000, 500000)
+ON CONFLICT (nama_kamar) DO UPDATE
+SET harga = COALESCE(rooms.harga, EXCLUDED.harga),
+    harga_weekend = COALESCE(rooms.harga_weekend, EXCLUDED.harga_weekend);
+
+UPDATE rooms SET harga_weekend = harga WHERE harga_weekend IS NULL;
+
+-- Tarif musiman: menggantikan tarif dasar di [mulai, selesai] (inklusif).
+-- kamar NULL = berlaku untuk semua kamar. Kalau tumpang tindih, id terbesar menang.
+CREATE TABLE IF NOT EXISTS tarif_musiman (
+    id SERIAL PRIMARY KEY,
+    kamar TEXT,
+    mulai DATE NOT NULL,
+    selesai DATE NOT NULL,
+    harga_weekday INTEGER NOT NULL,
+    harga_weekend INTEGER NOT NULL,
+    keterangan TEXT,
+    CHECK (selesai >= mulai)
+);
+
+-- Tanggal merah: tambahan per malam untuk semua kamar
+CREATE TABLE IF NOT EXISTS hari_libur (
+    tanggal DATE PRIMARY KEY,
+    nama TEXT NOT NULL,
+    tambahan INTEGER NOT NULL DEFAULT 0
+);
+
+-- Nomor versi tarif, naik setiap kali salah satu tabel tarif berubah.
+-- Kalender harga di aplikasi hanya dibangun ulang kalau versi ini berubah.
+CREATE TABLE IF NOT EXISTS tarif_versi (
+    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    versi BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO tarif_versi (id, versi) VALUES (1, 0) ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION naikkan_tarif_versi() RETURNS trigger AS $$
+BEGIN
+    UPDATE tarif_versi SET versi = versi + 1 WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER rooms_tarif_versi
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON rooms
+    FOR EACH STATEMENT EXECUTE FUNCTION naikkan_tarif_versi();
+
+CREATE TRIGGER tarif_musiman_tarif_versi
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON tarif_musiman
+    FOR EACH STATEMENT EXECUTE FUNCTION naikkan_tarif_versi();
+
+CREATE TRIGGER hari_libur_tarif_versi
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON hari_libur
+    FOR EACH STATEMENT EXECUTE FUNCTION naikkan_tarif_versi();
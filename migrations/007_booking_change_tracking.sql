@@ -0,0 +1,38 @@
+-- Penanda perubahan per baris, dipakai load_data() untuk sync incremental
+ALTER TABLE bookings
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp();
+
+CREATE INDEX IF NOT EXISTS idx_bookings_updated_at
+    ON bookings (updated_at);
+
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at = clock_timestamp();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bookings_updated_at
+    BEFORE UPDATE ON bookings
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+-- Jejak booking yang dihapus, supaya snapshot di aplikasi ikut membuangnya.
+-- Dipangkas aplikasi setiap hari (repository.prune_bookings_deleted).
+CREATE TABLE IF NOT EXISTS bookings_deleted (
+    id INTEGER NOT NULL,
+    deleted_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+);
+
+CREATE INDEX IF NOT EXISTS idx_bookings_deleted_at
+    ON bookings_deleted (deleted_at);
+
+CREATE OR REPLACE FUNCTION catat_booking_dihapus() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO bookings_deleted (id) VALUES (OLD.id);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bookings_deleted_log
+    AFTER DELETE ON bookings
+    FOR EACH ROW EXECUTE FUNCTION catat_booking_dihapus();
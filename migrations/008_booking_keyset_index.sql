@@ -0,0 +1,6 @@
+-- Keyset pagination tabel utama: ORDER BY checkin, id / WHERE (checkin, id) > (...)
+CREATE INDEX IF NOT EXISTS idx_bookings_checkin_id
+    ON bookings (checkin, id);
+
+-- Sudah tercakup index di atas
+DROP INDEX IF EXISTS idx_bookings_checkin;
@@ -0,0 +1,77 @@
+-- Rekap per kamar × bulan, dijaga trigger di setiap tulis ke bookings.
+-- Dashboard, judul bulan & sampul laporan cukup membaca tabel kecil ini.
+--
+-- booking, pendapatan, dp, sisa      : per bulan checkin
+-- malam_terjual, pendapatan_malam    : per bulan malamnya (booking lintas
+--                                      bulan dibagi ke tiap bulan)
+CREATE TABLE IF NOT EXISTS monthly_summary (
+    kamar TEXT NOT NULL,
+    bulan DATE NOT NULL,
+    booking INTEGER NOT NULL DEFAULT 0,
+    malam_terjual INTEGER NOT NULL DEFAULT 0,
+    pendapatan NUMERIC NOT NULL DEFAULT 0,
+    pendapatan_malam NUMERIC NOT NULL DEFAULT 0,
+    dp NUMERIC NOT NULL DEFAULT 0,
+    sisa NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (kamar, bulan)
+);
+
+-- Tambahkan (tanda = 1) atau kurangi (tanda = -1) kontribusi 1 booking
+CREATE OR REPLACE FUNCTION rekap_booking(b bookings, tanda INTEGER) RETURNS void AS $$
+BEGIN
+    INSERT INTO monthly_summary AS s (kamar, bulan, booking, pendapatan, dp, sisa)
+    VALUES (
+        b.kamar,
+        date_trunc('month', b.checkin)::date,
+        tanda,
+        tanda * COALESCE(b.total, 0),
+        tanda * COALESCE(b.dp, 0),
+        tanda * COALESCE(b.sisa, 0)
+    )
+    ON CONFLICT (kamar, bulan) DO UPDATE SET
+        booking = s.booking + EXCLUDED.booking,
+        pendapatan = s.pendapatan + EXCLUDED.pendapatan,
+        dp = s.dp + EXCLUDED.dp,
+        sisa = s.sisa + EXCLUDED.sisa;
+
+    IF b.checkout > b.checkin THEN
+        INSERT INTO monthly_summary AS s (kamar, bulan, malam_terjual, pendapatan_malam)
+        SELECT
+            b.kamar,
+            date_trunc('month', d)::date,
+            tanda * COUNT(*),
+            tanda * COUNT(*) * COALESCE(b.total, 0)::numeric / (b.checkout - b.checkin)
+        FROM generate_series(b.checkin, b.checkout - 1, interval '1 day') AS d
+        GROUP BY 2
+        ON CONFLICT (kamar, bulan) DO UPDATE SET
+            malam_terjual = s.malam_terjual + EXCLUDED.malam_terjual,
+            pendapatan_malam = s.pendapatan_malam + EXCLUDED.pendapatan_malam;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rekap_bookings() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM rekap_booking(OLD, -1);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM rekap_booking(NEW, 1);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bookings_rekap
+    AFTER INSERT OR DELETE ON bookings
+    FOR EACH ROW EXECUTE FUNCTION rekap_bookings();
+
+-- Update status harian (refresh_status) tidak menyentuh rekap
+CREATE TRIGGER bookings_rekap_update
+    AFTER UPDATE OF kamar, checkin, checkout, total, dp, sisa ON bookings
+    FOR EACH ROW EXECUTE FUNCTION rekap_bookings();
+
+-- Isi awal dari booking yang sudah ada
+SELECT rekap_booking(b, 1) FROM bookings b;
@@ -0,0 +1,103 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from homestay.availability import (
+    OKUPANSI_HARI,
+    cari_ketersediaan,
+    kamar_kosong,
+    okupansi_baru,
+    okupansi_bulan,
+    okupansi_hapus,
+    okupansi_tambah,
+)
+
+MULAI = date(2025, 1, 1)
+
+def bookings(*rows):
+    return pd.DataFrame(rows, columns=["id", "kamar", "checkin", "checkout"])
+
+@pytest.fixture
+def grid():
+    return okupansi_baru(MULAI, bookings(
+        (1, "A", date(2025, 1, 10), date(2025, 1, 13)),
+        (2, "B", date(2025, 1, 11), date(2025, 1, 12)),
+        (3, "A", date(2025, 1, 13), date(2025, 1, 15)),
+    ))
+
+def test_checkout_tidak_menempati_malam(grid):
+    # Malam 13 Januari milik booking 3, bukan booking 1
+    assert kamar_kosong(grid, ["A", "B"], date(2025, 1, 9), date(2025, 1, 10)) == ["A", "B"]
+    assert kamar_kosong(grid, ["A", "B"], date(2025, 1, 12), date(2025, 1, 13)) == ["B"]
+    assert kamar_kosong(grid, ["A", "B"], date(2025, 1, 15), date(2025, 1, 16)) == ["A", "B"]
+
+def test_kamar_tanpa_booking_selalu_kosong(grid):
+    assert kamar_kosong(grid, ["C"], date(2025, 1, 10), date(2025, 1, 20)) == ["C"]
+
+def test_di_luar_bitmap_return_none(grid):
+    assert kamar_kosong(grid, ["A"], date(2024, 12, 30), date(2025, 1, 2)) is None
+    assert cari_ketersediaan(grid, {"A": 1}, "A", date(2027, 1, 1), date(2027, 1, 2)) is None
+
+def test_hapus_hanya_mengurangi_span_booking(grid):
+    okupansi_hapus(grid, [1])
+
+    assert kamar_kosong(grid, ["A"], date(2025, 1, 10), date(2025, 1, 13)) == ["A"]
+    assert kamar_kosong(grid, ["A"], date(2025, 1, 13), date(2025, 1, 14)) == []
+    assert grid["terisi"].min() == 0
+
+    # Hapus id yang tidak ada / dua kali tidak mengubah apa pun
+    okupansi_hapus(grid, [1, 99])
+    assert int(grid["terisi"].sum()) == 1 + 2
+
+def test_edit_booking_pindah_tanggal(grid):
+    # Sync: baris yang berubah dihapus dulu lalu ditambah lagi
+    okupansi_hapus(grid, [2])
+    okupansi_tambah(grid, bookings((2, "B", date(2025, 2, 1), date(2025, 2, 3))))
+
+    assert kamar_kosong(grid, ["B"], date(2025, 1, 11), date(2025, 1, 12)) == ["B"]
+    assert kamar_kosong(grid, ["B"], date(2025, 2, 2), date(2025, 2, 3)) == []
+
+def test_booking_dipotong_di_batas_bitmap():
+    grid = okupansi_baru(MULAI, bookings(
+        (1, "A", date(2024, 12, 28), date(2025, 1, 3)),
+    ))
+    assert grid["span"][1][1:] == (0, 2)
+
+    okupansi_hapus(grid, [1])
+    assert not grid["terisi"].any()
+    assert grid["terisi"].shape == (1, OKUPANSI_HARI)
+
+def test_cari_ketersediaan_abaikan_booking_sendiri(grid):
+    hasil = cari_ketersediaan(grid, {"A": 1, "B": 1}, "A",
+                              date(2025, 1, 10), date(2025, 1, 13), booking_id=1)
+    assert hasil["tersedia"]
+
+def test_cari_ketersediaan_saran(grid):
+    tarif = {"A": 300_000, "B": 500_000, "C": 350_000, "D": 1_000_000}
+
+    hasil = cari_ketersediaan(grid, tarif, "A", date(2025, 1, 11), date(2025, 1, 13),
+                              jumlah=3, today=date(2025, 1, 10))
+
+    assert not hasil["tersedia"]
+    # B terisi 11 Januari; sisanya urut tarif paling mirip dengan A
+    assert hasil["kamar_lain"] == ["C", "D"]
+    # A terisi 10–14 Januari; jendela 2 malam terdekat, tidak sebelum hari ini
+    assert hasil["tanggal_lain"] == [
+        (date(2025, 1, 15), date(2025, 1, 17)),
+        (date(2025, 1, 16), date(2025, 1, 18)),
+        (date(2025, 1, 17), date(2025, 1, 19)),
+    ]
+
+def test_okupansi_bulan(grid):
+    peta = okupansi_bulan(grid, ["A", "B", "C"], date(2025, 1, 1))
+
+    assert peta.shape == (3, 31)
+    assert peta.loc["A"][peta.loc["A"]].index.tolist() == [10, 11, 12, 13, 14]
+    assert peta.loc["B"][peta.loc["B"]].index.tolist() == [11]
+    assert not peta.loc["C"].any()
+
+def test_okupansi_bulan_tanpa_bitmap():
+    peta = okupansi_bulan(None, ["A"], date(2025, 2, 1))
+    assert peta.shape == (1, 28)
+    assert not peta.to_numpy().any()
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from homestay.formatting import format_rupiah, rupiah
+
+def test_rupiah():
+    assert rupiah(0) == "Rp 0"
+    assert rupiah(1_234_567) == "Rp 1.234.567"
+    assert rupiah(-1_500) == "Rp -1.500"
+
+def test_format_rupiah_positif_negatif():
+    hasil = format_rupiah(pd.Series([500, 1_234_567, -123, -1_234_567]))
+    assert hasil.tolist() == ["Rp 500", "Rp 1.234.567", "Rp -123", "Rp -1.234.567"]
+
+def test_format_rupiah_dibulatkan():
+    assert format_rupiah(pd.Series([999.6, 1_000.4])).tolist() == ["Rp 1.000", "Rp 1.000"]
+
+def test_format_rupiah_nan_dan_teks_dibiarkan():
+    hasil = format_rupiah(pd.Series([np.nan, None, "-", 2_000], dtype=object))
+
+    assert pd.isna(hasil[0])
+    assert pd.isna(hasil[1])
+    assert hasil[2] == "-"
+    assert hasil[3] == "Rp 2.000"
+
+def test_format_rupiah_sama_dengan_rupiah():
+    nilai = [0, 7, 12_345, -98_765_432, 10**12]
+    assert format_rupiah(pd.Series(nilai)).tolist() == [rupiah(x) for x in nilai]
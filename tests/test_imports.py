@@ -0,0 +1,33 @@
+import importlib
+
+import pytest
+
+# Modul inti yang hanya butuh pandas/numpy
+MODUL_RINGAN = [
+    "homestay.availability",
+    "homestay.formatting",
+    "homestay.pricing",
+    "homestay.render",
+    "homestay.report_cache",
+    "homestay.status",
+]
+
+@pytest.mark.parametrize("nama", MODUL_RINGAN)
+def test_import_modul_ringan(nama):
+    importlib.import_module(nama)
+
+def test_import_repository():
+    pytest.importorskip("psycopg2")
+    importlib.import_module("homestay.repository")
+
+def test_import_reports():
+    for dep in ("reportlab", "xlsxwriter", "pypdf"):
+        pytest.importorskip(dep)
+    importlib.import_module("homestay.reports")
+
+def test_render_tidak_import_reports():
+    import sys
+
+    sys.modules.pop("homestay.reports", None)
+    importlib.reload(importlib.import_module("homestay.render"))
+    assert "homestay.reports" not in sys.modules
@@ -0,0 +1,96 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from homestay.pricing import (
+    build_price_calendar,
+    harga_rata_malam,
+    hitung_harga,
+    hitung_malam,
+    hitung_total_kamar,
+    rincian_harga,
+)
+
+TAHUN = 2025
+
+@pytest.fixture
+def kal():
+    rooms = pd.DataFrame({
+        "nama_kamar": ["A", "B"],
+        "harga": [300_000, 500_000],
+        "harga_weekend": [400_000, 650_000],
+    })
+    musiman = pd.DataFrame({
+        "id": [1, 2],
+        "kamar": ["A", None],
+        "mulai": [date(2025, 6, 2), date(2025, 12, 24)],
+        "selesai": [date(2025, 6, 3), date(2025, 12, 24)],
+        "harga_weekday": [350_000, 900_000],
+        "harga_weekend": [450_000, 950_000],
+        "keterangan": ["Libur sekolah", "Natal"],
+    })
+    libur = pd.DataFrame({
+        "tanggal": [date(2025, 8, 18)],
+        "nama": ["Cuti bersama"],
+        "tambahan": [100_000],
+    })
+    return build_price_calendar(rooms, musiman, libur, versi=1, tahun=TAHUN)
+
+def test_hitung_malam_weekend_jumat_sampai_minggu():
+    # Kamis 2 Jan → Senin 6 Jan: Kamis weekday; Jumat, Sabtu, Minggu weekend
+    assert tuple(map(int, hitung_malam(date(2025, 1, 2), date(2025, 1, 6)))) == (1, 3)
+    assert tuple(map(int, hitung_malam(date(2025, 1, 6), date(2025, 1, 13)))) == (4, 3)
+
+def test_hitung_malam_checkout_tidak_setelah_checkin():
+    assert tuple(map(int, hitung_malam(date(2025, 1, 6), date(2025, 1, 6)))) == (0, 0)
+    assert tuple(map(int, hitung_malam(date(2025, 1, 6), date(2025, 1, 2)))) == (0, 0)
+
+def test_hitung_harga_tarif_dasar(kal):
+    # 1 weekday + 3 weekend
+    assert hitung_total_kamar(kal, "A", date(2025, 1, 2), date(2025, 1, 6)) == 300_000 + 3 * 400_000
+
+def test_hitung_harga_banyak_kamar_sekaligus(kal):
+    total = hitung_harga(kal, ["A", "B"], date(2025, 1, 6), date(2025, 1, 8))
+    assert total.tolist() == [2 * 300_000, 2 * 500_000]
+
+def test_hitung_harga_tarif_musiman_dan_libur(kal):
+    # Senin 2 & Selasa 3 Juni: tarif musiman kamar A saja, selesai inklusif
+    assert hitung_total_kamar(kal, "A", date(2025, 6, 2), date(2025, 6, 5)) == 2 * 350_000 + 300_000
+    assert hitung_total_kamar(kal, "B", date(2025, 6, 2), date(2025, 6, 5)) == 3 * 500_000
+
+    # Musiman tanpa kamar berlaku untuk semua kamar
+    assert hitung_total_kamar(kal, "B", date(2025, 12, 24), date(2025, 12, 25)) == 900_000
+
+    # Senin 18 Agustus: tambahan hari libur di atas tarif weekday
+    assert hitung_total_kamar(kal, "A", date(2025, 8, 18), date(2025, 8, 19)) == 400_000
+
+def test_hitung_harga_batas_kalender(kal):
+    akhir = date(TAHUN + 3, 1, 1)
+
+    # Checkout tepat di ujung kalender masih dihitung dari cumsum
+    # (Kamis 30 & Jumat 31 Desember 2027)
+    assert hitung_total_kamar(kal, "A", date(TAHUN + 2, 12, 30), akhir) == 300_000 + 400_000
+
+    # Lewat ujung kalender → fallback tarif dasar
+    ci, co = date(TAHUN + 2, 12, 31), date(TAHUN + 3, 1, 3)
+    weekday, weekend = hitung_malam(ci, co)
+    assert hitung_total_kamar(kal, "A", ci, co) == weekday * 300_000 + weekend * 400_000
+
+    # Sebelum awal kalender juga fallback
+    # (Kamis 5 Januari 2023)
+    assert hitung_total_kamar(kal, "A", date(TAHUN - 2, 1, 5), date(TAHUN - 2, 1, 6)) == 300_000
+
+def test_rincian_harga_sama_dengan_total(kal):
+    for ci, co in [
+        (date(2025, 5, 29), date(2025, 6, 6)),
+        (date(2025, 8, 15), date(2025, 8, 20)),
+        (date(TAHUN + 2, 12, 29), date(TAHUN + 3, 1, 4)),
+    ]:
+        rincian = rincian_harga(kal, "A", ci, co)
+        assert sum(harga * malam for harga, malam in rincian) == hitung_total_kamar(kal, "A", ci, co)
+        assert sum(malam for _, malam in rincian) == (co - ci).days
+
+def test_harga_rata_malam():
+    assert harga_rata_malam(1_000_000, date(2025, 1, 1), date(2025, 1, 4)) == 333_333
+    assert harga_rata_malam(500_000, date(2025, 1, 1), date(2025, 1, 1)) == 0
@@ -0,0 +1,73 @@
+import os
+
+import pandas as pd
+import pytest
+
+from homestay import report_cache
+from homestay.report_cache import (
+    data_fingerprint,
+    report_cache_get,
+    report_cache_info,
+    report_cache_put,
+)
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_cache, "REPORT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(report_cache, "_stats", {"hits": 0, "misses": 0, "evictions": 0})
+    return tmp_path
+
+def test_miss_lalu_hit():
+    assert report_cache_get("pdf", "abc") is None
+    report_cache_put("pdf", "abc", b"isi")
+    assert report_cache_get("pdf", "abc") == b"isi"
+
+    info = report_cache_info()
+    assert (info["hits"], info["misses"], info["evictions"]) == (1, 1, 0)
+    assert info["bytes"] == 3
+
+def test_data_kosong_tidak_disimpan(cache_dir):
+    report_cache_put("pdf", "abc", b"")
+    assert os.listdir(cache_dir) == []
+
+def test_ekstensi_excel(cache_dir):
+    report_cache_put("excel", "abc", b"x")
+    assert [p.suffix for p in cache_dir.iterdir()] == [".xlsx"]
+
+def test_evict_paling_lama_dipakai(cache_dir, monkeypatch):
+    monkeypatch.setattr(report_cache, "REPORT_CACHE_MAX_BYTES", 25)
+
+    for i, nama in enumerate(["a", "b", "c"]):
+        report_cache_put("pdf", nama, b"x" * 10)
+        path = report_cache._report_path("pdf", nama)
+        os.utime(path, (1_000 + i, 1_000 + i))
+
+    # "c" membuat total 30 > 25 → "a" (mtime paling lama) dibuang
+    assert report_cache_info()["evictions"] == 1
+    assert report_cache_get("pdf", "a") is None
+
+    # Hit memperbarui mtime: "b" jadi paling baru, jadi "c" yang dibuang
+    assert report_cache_get("pdf", "b") is not None
+    report_cache_put("pdf", "d", b"x" * 10)
+
+    assert report_cache_get("pdf", "c") is None
+    assert report_cache_get("pdf", "b") is not None
+    assert report_cache_get("pdf", "d") is not None
+    assert report_cache_info()["evictions"] == 2
+
+def test_file_sementara_tidak_dievict(cache_dir, monkeypatch):
+    monkeypatch.setattr(report_cache, "REPORT_CACHE_MAX_BYTES", 5)
+    (cache_dir / ".tulis.tmp").write_bytes(b"x" * 100)
+
+    report_cache_put("pdf", "a", b"x" * 3)
+
+    assert (cache_dir / ".tulis.tmp").exists()
+    assert report_cache_get("pdf", "a") == b"x" * 3
+
+def test_fingerprint():
+    df = pd.DataFrame({"kamar": ["A", "B"], "total": [100, 200]})
+
+    assert data_fingerprint(df) == data_fingerprint(df.copy())
+    assert data_fingerprint(df) != data_fingerprint(df.assign(total=[100, 201]))
+    assert data_fingerprint(df) != data_fingerprint(df.rename(columns={"total": "harga"}))
+    assert data_fingerprint(df) != data_fingerprint(df.set_axis([5, 6]))
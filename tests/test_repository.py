@@ -0,0 +1,96 @@
+import inspect
+from datetime import date, datetime, timezone
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from homestay import repository
+from homestay.availability import kamar_kosong
+
+MULAI = date(2025, 1, 1)
+T0 = datetime(2025, 1, 20, 8, 0, tzinfo=timezone.utc)
+T1 = datetime(2025, 1, 20, 8, 5, tzinfo=timezone.utc)
+
+def baris(id, kamar, checkin, checkout, nama="Tamu"):
+    return {
+        "id": id, "nama": nama, "hp": "08", "kamar": kamar,
+        "checkin": checkin, "checkout": checkout,
+        "harga": 0, "total": 0, "dp": 0, "sisa": 0,
+        "status": "Booked", "group_id": None,
+    }
+
+def frame(*rows):
+    columns = [c.strip() for c in repository.BOOKING_COLUMNS.split(",")]
+    return pd.DataFrame(list(rows), columns=columns)
+
+@pytest.fixture
+def snap():
+    snap = repository.new_snapshot(MULAI)
+    repository.isi_snapshot(snap, frame(
+        baris(1, "A", date(2025, 1, 10), date(2025, 1, 12)),
+        baris(2, "B", date(2025, 1, 10), date(2025, 1, 12)),
+        baris(3, "A", date(2025, 2, 1), date(2025, 2, 3)),
+    ), T0)
+    return snap
+
+def ids(snap):
+    return sorted(snap["df"]["id"].tolist())
+
+def test_prune_default_retensi():
+    default = inspect.signature(repository.prune_bookings_deleted).parameters["retensi"].default
+    assert default == repository.LOG_HAPUS_RETENSI
+
+def test_merge_baris_dihapus(snap):
+    repository.merge_snapshot(snap, frame(), [2], [], T1)
+
+    assert ids(snap) == [1, 3]
+    assert kamar_kosong(snap["okupansi"], ["B"], date(2025, 1, 10), date(2025, 1, 12)) == ["B"]
+    assert snap["since"] == T1
+
+def test_merge_baris_diedit(snap):
+    repository.merge_snapshot(snap, frame(
+        baris(1, "A", date(2025, 1, 20), date(2025, 1, 21), nama="Baru"),
+    ), [], [], T1)
+
+    assert ids(snap) == [1, 2, 3]
+    assert snap["df"].loc[1, "nama"] == "Baru"
+    assert kamar_kosong(snap["okupansi"], ["A"], date(2025, 1, 10), date(2025, 1, 12)) == ["A"]
+    assert kamar_kosong(snap["okupansi"], ["A"], date(2025, 1, 20), date(2025, 1, 21)) == []
+
+def test_merge_dirty_tanpa_baris_dianggap_dihapus(snap):
+    snap["dirty"].update({2, 99})
+
+    # Sync ini hanya mengambil id 2; 99 ditandai setelah query jalan
+    repository.merge_snapshot(snap, frame(), [], [2], T1)
+
+    assert ids(snap) == [1, 3]
+    assert snap["dirty"] == {99}
+
+def test_merge_keluar_jendela(snap):
+    repository.merge_snapshot(snap, frame(
+        baris(3, "A", date(2024, 12, 1), date(2024, 12, 3)),
+    ), [], [3], T1)
+
+    assert ids(snap) == [1, 2]
+    assert kamar_kosong(snap["okupansi"], ["A"], date(2025, 2, 1), date(2025, 2, 3)) == ["A"]
+
+def test_merge_id_dipakai_ulang(snap):
+    # Setelah reset sequence: id 1 dihapus lalu dipakai booking baru
+    repository.merge_snapshot(snap, frame(
+        baris(1, "B", date(2025, 3, 1), date(2025, 3, 2), nama="Lain"),
+    ), [1, 2, 3], [], T1)
+
+    assert ids(snap) == [1]
+    assert snap["df"].loc[1, "nama"] == "Lain"
+    assert kamar_kosong(snap["okupansi"], ["A", "B"], date(2025, 1, 10), date(2025, 1, 12)) == ["A", "B"]
+    assert kamar_kosong(snap["okupansi"], ["B"], date(2025, 3, 1), date(2025, 3, 2)) == []
+    assert int(snap["okupansi"]["terisi"].sum()) == 1
+
+def test_clear_snapshot(snap):
+    snap["dirty"].add(5)
+    repository.clear_snapshot(snap)
+
+    assert snap["df"] is None and snap["okupansi"] is None
+    assert snap["since"] is None and not snap["dirty"]
@@ -0,0 +1,84 @@
+import re
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from homestay.status import REFRESH_STATUS_SQL, get_status
+
+TODAY = date(2025, 3, 10)
+
+def status_sql(checkin, checkout, sisa, today):
+    """Jalankan CASE dari REFRESH_STATUS_SQL di SQLite (tanggal ISO bisa dibandingkan sebagai teks)."""
+    case = re.search(r"CASE.*?END", REFRESH_STATUS_SQL, re.S).group(0)
+    case = case.replace("%(today)s", ":today").replace("::date", "")
+
+    with sqlite3.connect(":memory:") as db:
+        return db.execute(
+            f"SELECT {case} FROM (SELECT :checkin AS checkin, :checkout AS checkout, :sisa AS sisa)",
+            {
+                "today": today.isoformat(),
+                "checkin": checkin.isoformat(),
+                "checkout": checkout.isoformat(),
+                "sisa": sisa,
+            },
+        ).fetchone()[0]
+
+@pytest.mark.parametrize("checkin, checkout, sisa, expected", [
+    (TODAY - timedelta(days=5), TODAY - timedelta(days=1), 0, "Selesai"),
+    (TODAY - timedelta(days=2), TODAY, 100, "Check-out"),
+    (TODAY, TODAY + timedelta(days=2), 100, "Check-in"),
+    (TODAY - timedelta(days=1), TODAY + timedelta(days=1), 0, "Check-in"),
+    (TODAY + timedelta(days=1), TODAY + timedelta(days=3), 0, "Lunas"),
+    (TODAY + timedelta(days=1), TODAY + timedelta(days=3), -50, "Lunas"),
+    (TODAY + timedelta(days=1), TODAY + timedelta(days=3), 100, "Booked"),
+])
+def test_get_status(checkin, checkout, sisa, expected):
+    assert get_status(checkin, checkout, sisa, today=TODAY) == expected
+
+def test_refresh_status_sql_sama_dengan_get_status():
+    offsets = range(-4, 5)
+
+    for a in offsets:
+        for b in offsets:
+            if b <= a:
+                continue
+
+            checkin = TODAY + timedelta(days=a)
+            checkout = TODAY + timedelta(days=b)
+
+            for sisa in (-1, 0, 1):
+                assert status_sql(checkin, checkout, sisa, TODAY) == get_status(
+                    checkin, checkout, sisa, today=TODAY
+                ), (checkin, checkout, sisa)
+
+def test_refresh_status_lewati_baris_checkout_tidak_valid():
+    sql = (
+        REFRESH_STATUS_SQL
+        .replace("UPDATE bookings b", "UPDATE bookings AS b")
+        .replace("IS DISTINCT FROM", "IS NOT")
+        .replace("%(today)s", ":today")
+        .replace("::date", "")
+    )
+
+    with sqlite3.connect(":memory:") as db:
+        db.executescript("""
+            CREATE TABLE bookings (id INTEGER, checkin TEXT, checkout TEXT, sisa REAL, status TEXT);
+
+            -- Meniru bookings_checkout_after_checkin (NOT VALID): baris lama
+            -- boleh ada, tapi UPDATE baris itu ditolak
+            CREATE TRIGGER cek_tanggal BEFORE UPDATE ON bookings
+            WHEN NEW.checkout <= NEW.checkin
+            BEGIN SELECT RAISE(ABORT, 'check violation'); END;
+        """)
+        db.executemany("INSERT INTO bookings VALUES (?, ?, ?, ?, ?)", [
+            (1, "2025-03-01", "2025-03-03", 0, "Booked"),
+            (2, "2025-03-05", "2025-03-05", 0, "Booked"),
+            (3, "2025-03-05", "2025-03-01", 0, "Booked"),
+            (4, None, None, 100, "Lunas"),
+        ])
+
+        db.execute(sql, {"today": TODAY.isoformat()})
+        status = dict(db.execute("SELECT id, status FROM bookings"))
+
+    assert status == {1: "Selesai", 2: "Booked", 3: "Booked", 4: "Booked"}